@@ -2,9 +2,10 @@
 Memory optimization agent focused on reducing memory usage.
 """
 
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 import structlog
 from backend.llm_service import optimize_with_llm
+from shared.prompts import format_hotspots
 
 logger = structlog.get_logger()
 
@@ -22,16 +23,22 @@ Given the following Python code, optimize it to reduce memory usage through:
 
 Focus ONLY on memory usage. Return ONLY the optimized code, no explanations.
 
-Code to optimize:
+{hotspots}Code to optimize:
 {code}"""
 
-    async def generate_candidate(self, code: str, config: Dict[str, Any] = None) -> str:
+    async def generate_candidate(
+        self,
+        code: str,
+        config: Dict[str, Any] = None,
+        profile: Optional[Dict[str, Any]] = None,
+    ) -> str:
         """
         Generate an optimized candidate focused on memory improvements.
         
         Args:
             code: Original code to optimize
             config: Optional configuration
+            profile: Optional cProfile report of the code (benchmark_code's "profile")
         
         Returns:
             Optimized code string
@@ -41,7 +48,9 @@ Code to optimize:
             optimized = await optimize_with_llm(
                 code,
                 strategy=1,  # Memory optimization strategy
-                custom_prompt=self.PROMPT_TEMPLATE.format(code=code),
+                custom_prompt=self.PROMPT_TEMPLATE.format(
+                    code=code, hotspots=format_hotspots(profile)
+                ),
                 config=config
             )
             return optimized
@@ -2,9 +2,10 @@
 Runtime optimization agent focused on algorithmic improvements.
 """
 
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 import structlog
 from backend.llm_service import optimize_with_llm
+from shared.prompts import format_hotspots
 
 logger = structlog.get_logger()
 
@@ -22,16 +23,22 @@ Given the following Python code, optimize it to improve execution speed through:
 
 Focus ONLY on runtime performance. Return ONLY the optimized code, no explanations.
 
-Code to optimize:
+{hotspots}Code to optimize:
 {code}"""
 
-    async def generate_candidate(self, code: str, config: Dict[str, Any] = None) -> str:
+    async def generate_candidate(
+        self,
+        code: str,
+        config: Dict[str, Any] = None,
+        profile: Optional[Dict[str, Any]] = None,
+    ) -> str:
         """
         Generate an optimized candidate focused on runtime improvements.
         
         Args:
             code: Original code to optimize
             config: Optional configuration (temperature, max_tokens, etc.)
+            profile: Optional cProfile report of the code (benchmark_code's "profile")
         
         Returns:
             Optimized code string
@@ -41,7 +48,9 @@ Code to optimize:
             optimized = await optimize_with_llm(
                 code,
                 strategy=0,  # Algorithmic optimization strategy
-                custom_prompt=self.PROMPT_TEMPLATE.format(code=code),
+                custom_prompt=self.PROMPT_TEMPLATE.format(
+                    code=code, hotspots=format_hotspots(profile)
+                ),
                 config=config
             )
             return optimized
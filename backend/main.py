@@ -22,7 +22,7 @@ from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 from pydantic import BaseModel, Field
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 import structlog
 import difflib
 
@@ -30,6 +30,7 @@ from backend.auth import verify_jwt
 from backend.rate_limit import check_rate_limit, increment_usage
 from backend.optimization_loop import OptimizationLoop
 from backend.history import save_optimization_history
+from executor.scheduler import pin_host_process
 from shared.sanitize import validate_code_length, sanitize_code
 from shared.config import MAX_CODE_LENGTH, BACKEND_PORT
 
@@ -92,16 +93,53 @@ app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 
 security = HTTPBearer()
 
+
+@app.on_event("startup")
+def pin_sandbox_host() -> None:
+    # Once per process: keep the API off the cores sandbox runs are timed on
+    pin_host_process()
+
 # --------------------------------------------------
 # Models
 # --------------------------------------------------
 
+class TestCase(BaseModel):
+    """
+    Either a call of the entry function (args/kwargs, checked against
+    expected) or a whole-script run (stdin, checked against expected_output).
+    """
+    args: Optional[List[Any]] = None
+    kwargs: Optional[Dict[str, Any]] = None
+    expected: Any = None
+    stdin: Optional[str] = Field(default=None, max_length=10000)
+    expected_output: Optional[str] = Field(default=None, max_length=10000)
+
+
 class OptimizeRequest(BaseModel):
     code: str = Field(..., min_length=1, max_length=10000)
     max_refinements: int = Field(default=3, ge=1, le=5)
     runtime_preference: float = Field(default=0.6, ge=0.0, le=1.0)
     memory_preference: float = Field(default=0.25, ge=0.0, le=1.0)
     quality_preference: float = Field(default=0.15, ge=0.0, le=1.0)
+    # Optional benchmark suite
+    entry_point: Optional[str] = Field(default=None, max_length=100)
+    benchmark_driver: Optional[str] = Field(default=None, max_length=5000)
+    benchmark_sizes: Optional[List[int]] = Field(default=None, max_length=10)
+    test_cases: Optional[List[TestCase]] = Field(default=None, max_length=50)
+
+    def benchmark_suite(self) -> Optional[Dict[str, Any]]:
+        """The suite in the sandbox's format, or None if none was given."""
+        if not (self.benchmark_driver or self.test_cases):
+            return None
+        # The driver runs in the sandbox like the user's code; same rules
+        driver = sanitize_code(self.benchmark_driver)[0] if self.benchmark_driver else None
+        return {
+            "function": self.entry_point,
+            "driver": driver,
+            "sizes": self.benchmark_sizes or [],
+            # Only the fields the user set, so "expected": None is still checked
+            "test_cases": [case.model_dump(exclude_unset=True) for case in self.test_cases or []],
+        }
 
 
 class OptimizeResponse(BaseModel):
@@ -238,7 +276,8 @@ async def optimize(
         max_refinements=optimize_req.max_refinements,
         runtime_preference=optimize_req.runtime_preference,
         memory_preference=optimize_req.memory_preference,
-        quality_preference=optimize_req.quality_preference
+        quality_preference=optimize_req.quality_preference,
+        suite=optimize_req.benchmark_suite(),
     )
 
     # Generate diff
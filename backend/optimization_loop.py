@@ -4,19 +4,119 @@ RL-Controlled Agent Activation Version
 """
 
 import asyncio
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 import structlog
 import numpy as np
 
 from backend.agents import RuntimeAgent, MemoryAgent, ReadabilityAgent, CriticAgent
-from backend.reward import compute_multi_objective_reward
-from executor.sandbox import benchmark_code
+from backend.reward import (
+    compute_multi_objective_reward,
+    select_gc_signal,
+    select_memory_signal,
+    select_runtime_signal,
+)
+from executor.noise import get_noise_floor
+from executor.sandbox import (
+    benchmark_code,
+    benchmark_paired,
+    candidate_run_limit,
+    check_equivalence,
+)
+from executor.stats import significance, summary_ci_width
 from shared.sanitize import sanitize_code
+from shared.validate import validate_candidate
+from shared.config import (
+    BENCHMARK_PAIRED,
+    LINE_PROFILE_ENABLED,
+    PROFILE_HOTSPOTS,
+    REWARD_RUNTIME_SIGNAL,
+    TRACEMALLOC_ENABLED,
+)
 from backend.rl_model import get_meta_policy_action
 
 logger = structlog.get_logger()
 
 
+async def _apply_paired_runtime(
+    baseline_code: str,
+    baseline_runtime: float,
+    candidate_code: str,
+    candidate_result: Dict[str, Any],
+) -> None:
+    """
+    Replace a candidate's runtime with a drift-free estimate.
+    The baseline was timed minutes earlier under different load, so the
+    candidate is re-timed interleaved with it and its runtime re-expressed
+    on the baseline's scale as baseline_runtime / speedup.
+    """
+    if (
+        not BENCHMARK_PAIRED
+        or candidate_result.get("complexity") is not None
+        or candidate_result.get("driver") is not None
+    ):
+        # Function-only snippets and user drivers are timed on their own
+        # inputs; pairing would only compare the module bodies
+        return
+    paired = await benchmark_paired(baseline_code, candidate_code)
+    if not paired["success"] or paired["speedup"] <= 0:
+        logger.warning("Paired benchmark failed, keeping unpaired runtime", error=paired.get("error"))
+        return
+    candidate_result["measured_runtime"] = candidate_result["runtime"]
+    candidate_result["runtime"] = baseline_runtime / paired["speedup"]
+    candidate_result["speedup"] = paired["speedup"]
+    candidate_result["speedup_ci"] = paired["speedup_ci"]
+
+
+def _runtime_significance(
+    reference_result: Dict[str, Any],
+    candidate_result: Dict[str, Any],
+    noise_floor: float,
+    speedup_ci: Optional[List[float]] = None,
+) -> Dict[str, Any]:
+    """
+    Significance verdict on the candidate's runtime signal against the
+    reference's. Instruction counts are exact, so they get no noise floor.
+    Unpaired timings are judged against the noise floor combined with both
+    runs' own CI widths; paired ones against their speedup CI.
+    """
+    reference_runtime, candidate_runtime = select_runtime_signal(reference_result, candidate_result)
+    exact = (
+        REWARD_RUNTIME_SIGNAL == "cost"
+        and "instructions" in (reference_result.get("cost") or {})
+        and "instructions" in (candidate_result.get("cost") or {})
+    )
+    if exact:
+        return significance(reference_runtime, candidate_runtime, 0.0)
+    ci_widths = () if speedup_ci is not None else (
+        summary_ci_width(reference_result.get("stats")),
+        summary_ci_width(candidate_result.get("stats")),
+    )
+    return significance(reference_runtime, candidate_runtime, noise_floor, speedup_ci, ci_widths)
+
+
+def _significant_gain(
+    reference_result: Dict[str, Any],
+    candidate_result: Dict[str, Any],
+    noise_floor: float,
+) -> bool:
+    """Whether the candidate is measurably faster or leaner than the reference."""
+    if _runtime_significance(reference_result, candidate_result, noise_floor)["verdict"] == "faster":
+        return True
+    reference_memory, candidate_memory = select_memory_signal(reference_result, candidate_result)
+    return reference_memory > 0 and (reference_memory - candidate_memory) / reference_memory > noise_floor
+
+
+def _broken_tests(baseline_result: Dict[str, Any], candidate_result: Dict[str, Any]) -> List[int]:
+    """Indices of user test cases the baseline passes but the candidate fails."""
+    baseline_passes = (baseline_result.get("tests") or {}).get("results") or []
+    candidate_passes = (candidate_result.get("tests") or {}).get("results") or []
+    return [
+        index
+        for index, passed in enumerate(baseline_passes)
+        if passed and not (index < len(candidate_passes) and candidate_passes[index])
+    ]
+
+
 class OptimizationLoop:
     """Hierarchical optimization loop with RL-controlled multi-agent coordination."""
 
@@ -34,7 +134,14 @@ class OptimizationLoop:
         memory_preference: float = 0.25,
         quality_preference: float = 0.15,
         user_preferences: Dict[str, float] = None,
+        suite: Optional[Dict[str, Any]] = None,
     ) -> Dict[str, Any]:
+        """
+        Run the optimization rounds. `suite` is an optional user benchmark
+        driver and test cases (see executor.suite): the driver replaces the
+        default timing and candidates that fail a test the baseline passes
+        are dropped before the critic sees them.
+        """
 
         # -----------------------
         # SANITIZE INPUT
@@ -51,7 +158,18 @@ class OptimizationLoop:
         # -----------------------
         # BASELINE BENCHMARK
         # -----------------------
-        baseline_result = await benchmark_code(sanitized_code)
+        # Trace allocations so candidates can be compared on allocation
+        # volume rather than interpreter-dominated RSS; every candidate is
+        # traced the same way, so all memory figures are of one kind
+        count_ops = REWARD_RUNTIME_SIGNAL == "cost"
+        baseline_result = await benchmark_code(
+            sanitized_code,
+            trace_alloc=TRACEMALLOC_ENABLED,
+            count_ops=count_ops,
+            suite=suite,
+            profile=PROFILE_HOTSPOTS,
+            line_profile=LINE_PROFILE_ENABLED,
+        )
 
         if not baseline_result["success"]:
             logger.error("Baseline execution failed", error=baseline_result.get("error"), details=baseline_result)
@@ -59,6 +177,18 @@ class OptimizationLoop:
         
         baseline_runtime = baseline_result["runtime"]
         baseline_memory = baseline_result["memory"]
+        if baseline_result.get("tests") and baseline_result["test_pass_rate"] < 1.0:
+            logger.warning(
+                "Baseline fails some user test cases",
+                failures=baseline_result["tests"]["failures"],
+            )
+        # Candidates far slower than the baseline are killed early
+        run_limit = candidate_run_limit(baseline_result)
+        # Function-only snippets: time candidates on the baseline's inputs
+        workload = (baseline_result.get("complexity") or {}).get("spec")
+        # Smallest runtime difference this host can currently resolve
+        noise = await get_noise_floor()
+        noise_floor = noise["noise_floor"]
 
         # -----------------------
         # RL META POLICY
@@ -161,6 +291,10 @@ class OptimizationLoop:
         # INIT STATE
         # -----------------------
         current_code = sanitized_code
+        # Benchmark of best_code, the reference a new best must beat measurably
+        best_result = baseline_result
+        # Hot spots of current_code, quoted in the runtime and memory prompts
+        current_profile = baseline_result.get("profile")
         best_code = sanitized_code
         best_reward = -1.0
         best_strategy = "none"
@@ -192,12 +326,16 @@ class OptimizationLoop:
                 agents.append(("runtime", self.runtime_agent))  # Force at least one optimization attempt
 
             tasks = [
-                agent.generate_candidate(current_code, config={})
-                for _, agent in agents
+                agent.generate_candidate(current_code, config={}, profile=current_profile)
+                if name in ("runtime", "memory")
+                else agent.generate_candidate(current_code, config={})
+                for name, agent in agents
             ]
 
             candidates = await asyncio.gather(*tasks, return_exceptions=True)
 
+            # Candidates dropped before scoring, with the stage and reason
+            rejections: List[Dict[str, Any]] = []
             best_candidate = None
             best_candidate_reward = -1.0
             best_candidate_name = None
@@ -214,11 +352,67 @@ class OptimizationLoop:
                     logger.warning("Candidate sanitization failed", agent=name, warnings=sanitize_warnings)
                     continue
 
-                candidate_result = await benchmark_code(candidate_sanitized)
+                # Static checks in process, before any sandbox run
+                invalid = validate_candidate(sanitized_code, candidate_sanitized)
+                if invalid:
+                    logger.warning("Candidate rejected by validation", agent=name, reasons=invalid)
+                    rejections.append({"agent": name, "stage": "validation", "reasons": invalid})
+                    continue
+
+                # Cheap behavioural check before any benchmarking or critic call
+                equivalence = await check_equivalence(sanitized_code, candidate_sanitized, workload)
+                if equivalence.get("equivalent") is False:
+                    mismatch = equivalence.get("mismatch") or equivalence.get("reason")
+                    logger.warning("Candidate rejected as not equivalent", agent=name, mismatch=mismatch)
+                    rejections.append({"agent": name, "stage": "equivalence", "reasons": [mismatch]})
+                    continue
+
+                candidate_result = await benchmark_code(
+                    candidate_sanitized,
+                    trace_alloc=TRACEMALLOC_ENABLED,
+                    run_limit=run_limit,
+                    count_ops=count_ops,
+                    # Rewards come from the deterministic cost; one run is enough
+                    timed=not count_ops,
+                    workload=workload,
+                    suite=suite,
+                    profile=PROFILE_HOTSPOTS,
+                    line_profile=LINE_PROFILE_ENABLED,
+                )
+                if candidate_result.get("too_slow"):
+                    # Hard reject: no paired benchmark, no critic call
+                    logger.warning("Candidate rejected as too slow", agent=name, run_limit=run_limit)
+                    rejections.append({
+                        "agent": name,
+                        "stage": "too_slow",
+                        "reasons": [candidate_result.get("error")],
+                    })
+                    continue
                 if not candidate_result["success"]:
                     logger.warning("Candidate execution failed", agent=name, error=candidate_result.get("error"), details=candidate_result)
                     continue
 
+                broken = _broken_tests(baseline_result, candidate_result)
+                if broken:
+                    # Behaviour changed: no paired benchmark, no critic call
+                    logger.warning(
+                        "Candidate rejected for failing test cases",
+                        agent=name,
+                        cases=broken,
+                        failures=candidate_result["tests"]["failures"],
+                    )
+                    rejections.append({
+                        "agent": name,
+                        "stage": "tests",
+                        "reasons": [f["reason"] for f in candidate_result["tests"]["failures"]],
+                    })
+                    continue
+
+                if not count_ops:
+                    await _apply_paired_runtime(
+                        sanitized_code, baseline_runtime, candidate_sanitized, candidate_result
+                    )
+
                 critic_score, detailed_scores, safety_status = (
                     await self.critic_agent.score_candidate(
                         current_code,
@@ -228,12 +422,19 @@ class OptimizationLoop:
 
                 # Calculate previous rewards for stability variance
                 previous_rewards = [t.get("reward", 0) for t in trace] if trace else []
+                reward_baseline_runtime, reward_opt_runtime = select_runtime_signal(
+                    baseline_result, candidate_result
+                )
+                reward_baseline_memory, reward_opt_memory = select_memory_signal(
+                    baseline_result, candidate_result
+                )
+                reward_baseline_gc, reward_opt_gc = select_gc_signal(baseline_result, candidate_result)
 
                 reward_result = compute_multi_objective_reward(
-                    baseline_runtime=baseline_runtime,
-                    baseline_memory=baseline_memory,
-                    opt_runtime=candidate_result["runtime"],
-                    opt_memory=candidate_result["memory"],
+                    baseline_runtime=reward_baseline_runtime,
+                    baseline_memory=reward_baseline_memory,
+                    opt_runtime=reward_opt_runtime,
+                    opt_memory=reward_opt_memory,
                     critic_score=critic_score,
                     runtime_weight=runtime_weight,
                     memory_weight=memory_weight,
@@ -244,6 +445,8 @@ class OptimizationLoop:
                     safety_status=safety_status,
                     previous_rewards=previous_rewards,
                     episode_actions=episode_actions,  # Pass episode actions for diversity regularization
+                    baseline_gc=reward_baseline_gc,
+                    opt_gc=reward_opt_gc,
                 )
 
                 if reward_result["reward"] > best_candidate_reward:
@@ -254,10 +457,19 @@ class OptimizationLoop:
                     best_safety_status = safety_status
 
             if best_candidate and best_candidate_reward > best_reward:
-                best_reward = best_candidate_reward
-                best_code = best_candidate
-                best_strategy = best_candidate_name
-                current_code = best_candidate
+                if _significant_gain(best_result, best_candidate_result, noise_floor):
+                    best_reward = best_candidate_reward
+                    best_code = best_candidate
+                    best_strategy = best_candidate_name
+                    best_result = best_candidate_result
+                    current_code = best_candidate
+                    current_profile = best_candidate_result.get("profile")
+                else:
+                    logger.info(
+                        "Best candidate's gain is within the noise floor, keeping current code",
+                        agent=best_candidate_name,
+                        noise_floor=noise_floor,
+                    )
             elif not best_candidate:
                 # If no candidates succeeded, log warning but continue
                 logger.warning(f"No successful candidates in round {round_num + 1} - all failed execution or sanitization")
@@ -284,12 +496,19 @@ class OptimizationLoop:
             if best_candidate_result:
                 # Calculate previous rewards for stability variance
                 previous_rewards = [t.get("reward", 0) for t in trace] if trace else []
+                reward_baseline_runtime, reward_opt_runtime = select_runtime_signal(
+                    baseline_result, best_candidate_result
+                )
+                reward_baseline_memory, reward_opt_memory = select_memory_signal(
+                    baseline_result, best_candidate_result
+                )
+                reward_baseline_gc, reward_opt_gc = select_gc_signal(baseline_result, best_candidate_result)
                 
                 reward_result = compute_multi_objective_reward(
-                    baseline_runtime=baseline_runtime,
-                    baseline_memory=baseline_memory,
-                    opt_runtime=best_candidate_result["runtime"],
-                    opt_memory=best_candidate_result["memory"],
+                    baseline_runtime=reward_baseline_runtime,
+                    baseline_memory=reward_baseline_memory,
+                    opt_runtime=reward_opt_runtime,
+                    opt_memory=reward_opt_memory,
                     critic_score=critic_score if 'critic_score' in locals() else 0.5,
                     runtime_weight=runtime_weight,
                     memory_weight=memory_weight,
@@ -300,6 +519,8 @@ class OptimizationLoop:
                     safety_status=best_safety_status,
                     previous_rewards=previous_rewards,
                     episode_actions=episode_actions,  # Pass episode actions for diversity regularization
+                    baseline_gc=reward_baseline_gc,
+                    opt_gc=reward_opt_gc,
                 )
                 reward_components = reward_result.get("components", {})
 
@@ -328,6 +549,35 @@ class OptimizationLoop:
                         if best_candidate_result and baseline_memory > 0
                         else 0
                     ),
+                    "speedup_ci": best_candidate_result.get("speedup_ci") if best_candidate_result else None,
+                    "significance": (
+                        _runtime_significance(
+                            baseline_result,
+                            best_candidate_result,
+                            noise_floor,
+                            best_candidate_result.get("speedup_ci"),
+                        )
+                        if best_candidate_result
+                        else None
+                    ),
+                    "cost": best_candidate_result.get("cost") if best_candidate_result else None,
+                    "complexity": (
+                        (best_candidate_result.get("complexity") or {}).get("fit")
+                        if best_candidate_result
+                        else None
+                    ),
+                    # Per-line counts and time shares, to compare with the
+                    # baseline's and annotate the diff
+                    "line_profile": (
+                        best_candidate_result.get("line_profile") if best_candidate_result else None
+                    ),
+                    "rejections": rejections,
+                    # Compared by digest: outputs may be far larger than what is kept
+                    "output_matches_baseline": (
+                        best_candidate_result.get("output_sha256") == baseline_result.get("output_sha256")
+                        if best_candidate_result and baseline_result.get("output_sha256")
+                        else None
+                    ),
                 }
             )
 
@@ -340,11 +590,25 @@ class OptimizationLoop:
             final_result = {
                 "runtime": baseline_runtime,
                 "memory": baseline_memory,
-                "test_pass_rate": 1.0,  # Original code should pass tests
+                "test_pass_rate": baseline_result["test_pass_rate"],
             }
             best_reward = 0.0  # Set to neutral reward if no optimization happened
-        else:
-            final_result = await benchmark_code(best_code)
+        elif count_ops and best_result is not baseline_result:
+            # Candidates were run once for their cost only: time the winner,
+            # under the options it was selected with
+            final_result = await benchmark_code(
+                best_code,
+                trace_alloc=TRACEMALLOC_ENABLED,
+                count_ops=count_ops,
+                workload=workload,
+                suite=suite,
+                profile=PROFILE_HOTSPOTS,
+                line_profile=LINE_PROFILE_ENABLED,
+            )
+            if final_result["success"]:
+                await _apply_paired_runtime(
+                    sanitized_code, baseline_runtime, best_code, final_result
+                )
 
             if not final_result["success"]:
                 logger.warning("Final benchmark failed.")
@@ -353,6 +617,9 @@ class OptimizationLoop:
                     "memory": baseline_memory,
                     "test_pass_rate": 0.0,
                 }
+        else:
+            # The timed (and already paired) run that selected best_code
+            final_result = best_result
 
         runtime_improvement = (
             (baseline_runtime - final_result["runtime"])
@@ -385,6 +652,23 @@ class OptimizationLoop:
                 "runtime_improvement_pct": runtime_improvement,
                 "memory_improvement_pct": memory_improvement,
                 "test_pass_rate": final_result.get("test_pass_rate", 1.0),
+                "speedup": final_result.get("speedup"),
+                "speedup_ci": final_result.get("speedup_ci"),
+                "noise_floor": noise_floor,
+                "runtime_significance": _runtime_significance(
+                    baseline_result, final_result, noise_floor, final_result.get("speedup_ci")
+                ),
+                "baseline_cost": baseline_result.get("cost"),
+                "baseline_cold_runtime": baseline_result.get("cold_runtime"),
+                "optimized_cold_runtime": final_result.get("cold_runtime"),
+                "baseline_import_time": baseline_result.get("import_time"),
+                "optimized_import_time": final_result.get("import_time"),
+                "baseline_gc": baseline_result.get("gc"),
+                "optimized_gc": final_result.get("gc"),
+                "tests": final_result.get("tests"),
+                "baseline_line_profile": baseline_result.get("line_profile"),
+                "baseline_complexity": (baseline_result.get("complexity") or {}).get("fit"),
+                "optimized_complexity": (final_result.get("complexity") or {}).get("fit"),
             },
             "objective_weights": {
                 "runtime": runtime_weight,
@@ -8,9 +8,11 @@ import structlog
 
 from backend.rl_model import get_strategy
 from backend.llm_service import optimize_with_llm
-from executor.sandbox import execute_code, benchmark_code
+from executor.sandbox import execute_code, benchmark_code, candidate_run_limit, check_equivalence
 from shared.sanitize import sanitize_code
-from shared.config import MAX_REFINEMENT_STEPS
+from shared.validate import validate_candidate
+from shared.config import MAX_REFINEMENT_STEPS, TRACEMALLOC_ENABLED, REWARD_RUNTIME_SIGNAL
+from backend.reward import select_memory_signal, select_runtime_signal
 
 logger = structlog.get_logger()
 
@@ -34,17 +36,22 @@ async def optimize_code(code: str, max_refinements: int = 3) -> Dict[str, Any]:
     if not sanitized_code:
         raise ValueError("Code sanitization failed or code is empty")
     
-    # Get baseline metrics
-    baseline_result = await benchmark_code(sanitized_code)
+    # Get baseline metrics; candidates are traced the same way so memory is
+    # compared on traced peaks throughout
+    count_ops = REWARD_RUNTIME_SIGNAL == "cost"
+    baseline_result = await benchmark_code(sanitized_code, trace_alloc=TRACEMALLOC_ENABLED, count_ops=count_ops)
     if not baseline_result["success"]:
         raise ValueError(f"Baseline execution failed: {baseline_result.get('error')}")
     
     baseline_runtime = baseline_result["runtime"]
     baseline_memory = baseline_result["memory"]
+    run_limit = candidate_run_limit(baseline_result)
+    workload = (baseline_result.get("complexity") or {}).get("spec")
     
     # Initialize state for RL
     current_code = sanitized_code
     best_code = sanitized_code
+    best_result = baseline_result
     best_reward = -1.0
     best_strategy = 6  # Stop
     
@@ -77,18 +84,44 @@ async def optimize_code(code: str, max_refinements: int = 3) -> Dict[str, Any]:
                 logger.warning(f"Optimized code failed sanitization at step {step}")
                 continue
             
+            invalid = validate_candidate(sanitized_code, opt_sanitized)
+            if invalid:
+                logger.warning(f"Optimized code rejected by validation at step {step}: {invalid}")
+                continue
+
+            equivalence = await check_equivalence(sanitized_code, opt_sanitized, workload)
+            if equivalence.get("equivalent") is False:
+                logger.warning(f"Optimized code rejected as not equivalent at step {step}")
+                continue
+
             # Benchmark optimized code
-            opt_result = await benchmark_code(opt_sanitized)
+            opt_result = await benchmark_code(
+                opt_sanitized,
+                trace_alloc=TRACEMALLOC_ENABLED,
+                run_limit=run_limit,
+                count_ops=count_ops,
+                timed=not count_ops,
+                workload=workload,
+            )
+            if opt_result.get("too_slow"):
+                logger.warning(f"Optimized code rejected as too slow at step {step}")
+                continue
             if not opt_result["success"]:
                 logger.warning(f"Optimized code execution failed at step {step}")
                 continue
             
             # Calculate reward
+            reward_baseline_runtime, reward_opt_runtime = select_runtime_signal(
+                baseline_result, opt_result
+            )
+            reward_baseline_memory, reward_opt_memory = select_memory_signal(
+                baseline_result, opt_result
+            )
             reward = calculate_reward(
-                baseline_runtime=baseline_runtime,
-                baseline_memory=baseline_memory,
-                opt_runtime=opt_result["runtime"],
-                opt_memory=opt_result["memory"],
+                baseline_runtime=reward_baseline_runtime,
+                baseline_memory=reward_baseline_memory,
+                opt_runtime=reward_opt_runtime,
+                opt_memory=reward_opt_memory,
                 baseline_code=current_code,
                 opt_code=opt_sanitized,
                 test_pass_rate=opt_result.get("test_pass_rate", 0.0)
@@ -98,6 +131,7 @@ async def optimize_code(code: str, max_refinements: int = 3) -> Dict[str, Any]:
             if reward > best_reward:
                 best_reward = reward
                 best_code = opt_sanitized
+                best_result = opt_result
                 best_strategy = strategy
                 current_code = opt_sanitized  # Continue from best
                 warnings.extend(opt_warnings)
@@ -106,8 +140,17 @@ async def optimize_code(code: str, max_refinements: int = 3) -> Dict[str, Any]:
             logger.error(f"Optimization step {step} failed: {e}")
             continue
     
-    # Final benchmark of best code
-    final_result = await benchmark_code(best_code)
+    # Final benchmark of best code: reuse the run that selected it, unless
+    # that was an untimed cost-only run
+    if count_ops and best_result is not baseline_result:
+        final_result = await benchmark_code(
+            best_code,
+            trace_alloc=TRACEMALLOC_ENABLED,
+            count_ops=count_ops,
+            workload=workload,
+        )
+    else:
+        final_result = best_result
     
     # Generate diff
     diff = generate_diff(sanitized_code, best_code)
@@ -2,11 +2,92 @@
 Multi-objective reward engine for hierarchical optimization.
 """
 
-from typing import Dict, Any
+from typing import Dict, Any, Tuple
 import structlog
 
+from shared.config import (
+    REWARD_AMORTIZE_RUNS,
+    REWARD_GC_SHARE,
+    REWARD_RUNTIME_PHASE,
+    REWARD_RUNTIME_SIGNAL,
+)
+
 logger = structlog.get_logger()
 
+
+def phase_runtime(result: Dict[str, Any]) -> float:
+    """
+    The benchmark's runtime for REWARD_RUNTIME_PHASE. "runtime" is the
+    steady-state figure (possibly re-expressed by a paired benchmark), so
+    setup costs are derived from the cold run relative to it.
+    """
+    warm = result.get("runtime", 0.0)
+    cold = result.get("cold_runtime")
+    if cold is None or REWARD_RUNTIME_PHASE == "warm":
+        return warm
+    if REWARD_RUNTIME_PHASE == "cold":
+        return cold
+    # Amortized: one cold run followed by N - 1 warm ones
+    runs = max(REWARD_AMORTIZE_RUNS, 1)
+    return (cold + (runs - 1) * warm) / runs
+
+
+def select_runtime_signal(
+    baseline_result: Dict[str, Any],
+    opt_result: Dict[str, Any],
+) -> Tuple[float, float]:
+    """
+    Pick the (baseline, optimized) runtime figures to feed into the reward.
+    With REWARD_RUNTIME_SIGNAL = "cost" and instruction counts on both
+    sides, compare executed bytecode instructions, which are reproducible
+    run to run; otherwise fall back to measured runtime for
+    REWARD_RUNTIME_PHASE (see phase_runtime).
+    """
+    if REWARD_RUNTIME_SIGNAL == "cost":
+        baseline_cost = baseline_result.get("cost") or {}
+        opt_cost = opt_result.get("cost") or {}
+        if "instructions" in baseline_cost and "instructions" in opt_cost:
+            return float(baseline_cost["instructions"]), float(opt_cost["instructions"])
+    return phase_runtime(baseline_result), phase_runtime(opt_result)
+
+
+def select_memory_signal(
+    baseline_result: Dict[str, Any],
+    opt_result: Dict[str, Any],
+) -> Tuple[float, float]:
+    """
+    Pick the (baseline, optimized) memory figures to feed into the reward.
+    When both benchmarks ran with allocation tracing, compare traced peak
+    allocation volume, which is not swamped by interpreter RSS; otherwise
+    fall back to peak RSS.
+    """
+    baseline_alloc = baseline_result.get("allocations") or {}
+    opt_alloc = opt_result.get("allocations") or {}
+    if "peak_mb" in baseline_alloc and "peak_mb" in opt_alloc:
+        return baseline_alloc["peak_mb"], opt_alloc["peak_mb"]
+    return baseline_result.get("memory", 0.0), opt_result.get("memory", 0.0)
+
+
+def select_gc_signal(
+    baseline_result: Dict[str, Any],
+    opt_result: Dict[str, Any],
+) -> Tuple[float, float]:
+    """
+    Pick the (baseline, optimized) GC pressure figures: net GC-tracked
+    allocations per call of the timed work, which is what triggers cyclic
+    collections and, unlike time spent collecting, does not depend on when
+    the collector happened to run. (0, 0) unless both sides report it.
+    """
+    baseline_gc = baseline_result.get("gc") or {}
+    opt_gc = opt_result.get("gc") or {}
+    if "allocations_per_call" in baseline_gc and "allocations_per_call" in opt_gc:
+        return (
+            max(baseline_gc["allocations_per_call"], 0.0),
+            max(opt_gc["allocations_per_call"], 0.0),
+        )
+    return 0.0, 0.0
+
+
 def compute_multi_objective_reward(
     baseline_runtime: float,
     baseline_memory: float,
@@ -21,15 +102,18 @@ def compute_multi_objective_reward(
     test_pass_rate: float = 1.0,
     safety_status: str = "SAFE",
     previous_rewards: list = None,
-    episode_actions: list = None  # Track actions for diversity regularization
+    episode_actions: list = None,  # Track actions for diversity regularization
+    baseline_gc: float = 0.0,
+    opt_gc: float = 0.0,
 ) -> Dict[str, Any]:
     """
     Compute multi-objective reward with weighted objectives.
     
     Args:
-        baseline_runtime: Original runtime in seconds
+        baseline_runtime: Original runtime in seconds (or instruction count,
+            see select_runtime_signal)
         baseline_memory: Original memory in MB
-        opt_runtime: Optimized runtime in seconds
+        opt_runtime: Optimized runtime, in the same unit as baseline_runtime
         opt_memory: Optimized memory in MB
         critic_score: Quality score from critic (0-1)
         runtime_weight: Weight for runtime objective (default 0.6)
@@ -38,12 +122,16 @@ def compute_multi_objective_reward(
         baseline_code: Original code (for length penalty)
         opt_code: Optimized code (for length penalty)
         test_pass_rate: Test pass rate (0-1)
+        baseline_gc: Original GC pressure (see select_gc_signal)
+        opt_gc: Optimized GC pressure; when the baseline has any, the GC
+            gain takes REWARD_GC_SHARE of the memory objective
     
     Returns:
         Dict with:
         - reward: Overall reward (-1 to 1)
         - runtime_gain: Normalized runtime improvement (-1 to 1)
         - memory_gain: Normalized memory improvement (-1 to 1)
+        - gc_gain: Normalized GC pressure improvement (-1 to 1)
         - quality_score: Critic quality score (0-1)
         - components: Breakdown of reward components
     """
@@ -60,6 +148,14 @@ def compute_multi_objective_reward(
         memory_gain = max(-1.0, min(1.0, memory_gain))  # Clip to [-1, 1]
     else:
         memory_gain = 0.0
+
+    # Normalize GC pressure improvement (-1 to 1) and fold it into memory
+    if baseline_gc > 0:
+        gc_gain = (baseline_gc - opt_gc) / baseline_gc
+        gc_gain = max(-1.0, min(1.0, gc_gain))
+        memory_gain = (1 - REWARD_GC_SHARE) * memory_gain + REWARD_GC_SHARE * gc_gain
+    else:
+        gc_gain = 0.0
     
     # Normalize quality score (already 0-1, but ensure it's in range)
     quality_score = max(0.0, min(1.0, critic_score))
@@ -142,6 +238,7 @@ def compute_multi_objective_reward(
         "reward": reward,
         "runtime_gain": runtime_gain,
         "memory_gain": memory_gain,
+        "gc_gain": gc_gain,
         "quality_score": quality_score,
         "test_pass_rate": test_pass_rate,
         "length_penalty": length_penalty,
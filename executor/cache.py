@@ -0,0 +1,181 @@
+"""
+Content-addressed benchmark result cache.
+
+Results are keyed by a hash of the code, the measurement options, the
+harness version and the fingerprint of the machine that ran them (this host
+or a remote daemon, see executor.remote). An in-memory LRU sits in front of
+a directory of JSON files with TTL eviction.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Any, Optional
+import structlog
+
+from executor.fingerprint import fingerprint_id
+from executor.harness import HARNESS_VERSION
+from shared.config import (
+    BENCHMARK_CACHE_DIR,
+    BENCHMARK_CACHE_SIZE,
+    BENCHMARK_CACHE_TTL,
+    BENCHMARK_CACHE_MIN_SAMPLES,
+)
+
+logger = structlog.get_logger()
+
+# Sweep expired files from disk every this many writes
+_SWEEP_EVERY = 64
+
+
+def _default_dir() -> Path:
+    return Path.home() / ".cache" / "rl-code-agent" / "benchmarks"
+
+
+class BenchmarkCache:
+    """Two-tier (memory LRU + disk TTL) store of benchmark results."""
+
+    def __init__(
+        self,
+        directory: Optional[Path] = None,
+        max_entries: int = BENCHMARK_CACHE_SIZE,
+        ttl: float = BENCHMARK_CACHE_TTL,
+        min_samples: int = BENCHMARK_CACHE_MIN_SAMPLES,
+    ):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.min_samples = min_samples
+        self._memory: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        # put() runs in a worker thread (see executor.sandbox)
+        self._lock = threading.Lock()
+        self._writes = 0
+
+        if self.directory is not None:
+            try:
+                self.directory.mkdir(parents=True, exist_ok=True)
+            except OSError as e:
+                logger.warning("Benchmark cache directory unavailable, memory only", error=str(e))
+                self.directory = None
+
+    @staticmethod
+    def key(
+        kind: str,
+        code: str,
+        options: Optional[Dict[str, Any]] = None,
+        machine_id: Optional[str] = None,
+    ) -> str:
+        """Cache key of a run on `machine_id` (default: this host)."""
+        payload = json.dumps(
+            {
+                "kind": kind,
+                "code": code,
+                "options": options or {},
+                "harness": HARNESS_VERSION,
+                "machine": machine_id or fingerprint_id(),
+            },
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json"
+
+    def _expired(self, entry: Dict[str, Any]) -> bool:
+        return time.time() - entry["stored_at"] > self.ttl
+
+    def confident(self, result: Dict[str, Any]) -> bool:
+        """Whether a result has enough samples to be worth reusing."""
+        return bool(result.get("success")) and result.get("samples", 0) >= self.min_samples
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+        if entry is None and self.directory is not None:
+            path = self._path(key)
+            try:
+                entry = json.loads(path.read_text())
+            except (OSError, ValueError):
+                entry = None
+            if entry is not None:
+                self._remember(key, entry)
+
+        if entry is None:
+            return None
+        if self._expired(entry) or not self.confident(entry["result"]):
+            self.invalidate(key)
+            return None
+
+        # Callers annotate results in place; hand out a copy
+        result = json.loads(json.dumps(entry["result"]))
+        result["cached"] = True
+        return result
+
+    def put(self, key: str, result: Dict[str, Any]) -> None:
+        if not self.confident(result):
+            return
+        entry = {"stored_at": time.time(), "result": json.loads(json.dumps(result))}
+        self._remember(key, entry)
+
+        if self.directory is None:
+            return
+        path = self._path(key)
+        try:
+            path.parent.mkdir(exist_ok=True)
+            tmp = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(entry))
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning("Benchmark cache write failed", error=str(e))
+            return
+
+        self._writes += 1
+        if self._writes % _SWEEP_EVERY == 0:
+            self.sweep()
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            self._memory.pop(key, None)
+        if self.directory is not None:
+            try:
+                self._path(key).unlink()
+            except OSError:
+                pass
+
+    def sweep(self) -> int:
+        """Delete expired entries from disk. Returns the number removed."""
+        if self.directory is None:
+            return 0
+        removed = 0
+        cutoff = time.time() - self.ttl
+        for path in self.directory.glob("*/*.json"):
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+                    removed += 1
+            except OSError:
+                pass
+        return removed
+
+    def _remember(self, key: str, entry: Dict[str, Any]) -> None:
+        with self._lock:
+            self._memory[key] = entry
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+
+_cache: Optional[BenchmarkCache] = None
+
+
+def get_cache() -> BenchmarkCache:
+    global _cache
+    if _cache is None:
+        directory = Path(BENCHMARK_CACHE_DIR) if BENCHMARK_CACHE_DIR else _default_dir()
+        _cache = BenchmarkCache(directory)
+    return _cache
@@ -0,0 +1,55 @@
+"""
+Bounded capture of a child's output streams.
+
+Only the first `limit` bytes of a stream are kept, but every byte is read
+(so the child never blocks on a full pipe) and fed into a SHA-256 digest,
+which identifies the complete output without storing it.
+"""
+import asyncio
+import hashlib
+from typing import Dict, Any, Optional
+
+
+class BoundedCapture:
+    """Keeps a prefix of a byte stream plus its total size and digest."""
+
+    def __init__(self, limit: Optional[int] = None):
+        self.limit = limit
+        self.buffer = bytearray()
+        self.total = 0
+        self._digest = hashlib.sha256()
+
+    def feed(self, chunk: bytes) -> None:
+        self.total += len(chunk)
+        self._digest.update(chunk)
+        if self.limit is None:
+            self.buffer.extend(chunk)
+            return
+        room = self.limit - len(self.buffer)
+        if room > 0:
+            self.buffer.extend(chunk[:room])
+
+    @property
+    def truncated(self) -> bool:
+        return self.total > len(self.buffer)
+
+    def text(self) -> str:
+        return self.buffer.decode(errors="replace")
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "bytes": self.total,
+            "truncated": self.truncated,
+            "sha256": self._digest.hexdigest(),
+        }
+
+
+async def drain(stream: Optional[asyncio.StreamReader], capture: BoundedCapture, chunk_size: int = 65536) -> None:
+    """Read an asyncio stream to EOF into `capture`."""
+    if stream is None:
+        return
+    while True:
+        chunk = await stream.read(chunk_size)
+        if not chunk:
+            return
+        capture.feed(chunk)
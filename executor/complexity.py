@@ -0,0 +1,610 @@
+"""
+Input synthesis and empirical complexity fitting for function-only snippets.
+
+Most dataset samples only define functions and never call them, so timing
+the module body measures nothing but ``def`` statements. For those snippets
+the entry function is called on synthesized inputs at a geometric series of
+sizes and a complexity class is fitted to the timings.
+
+Argument kinds are inferred from how each parameter is used in the function
+body (iterated, indexed twice, ``.items()``, string methods, ``range(n)``,
+...), then validated with a small call and adjusted until one works.
+
+Standard library only (like executor.harness): the static checks run in
+the backend, the timing inside the sandbox child.
+"""
+import ast
+import math
+import os
+import random
+import statistics
+import sys
+import time
+from typing import Dict, Any, Callable, List, Optional
+
+from executor.harness import GCMonitor, TimeLimitExceeded, gc_section, kill_after, time_limit
+
+# Every kind the synthesizer can produce, in fallback order
+KINDS = (
+    "int_list", "int", "str_list", "str", "matrix", "dict", "dict_list", "graph", "tree",
+    "scalar", "missing", "start", "end",
+)
+
+# Parameter names that hint at a kind before usage is considered
+_SIZE_NAMES = {"n", "size", "count", "num", "length", "limit", "depth", "times", "iterations", "steps"}
+# Looked-up values get one that is never present, so searches scan everything
+_MISSING_NAMES = {"target", "key", "value", "val", "x", "item", "element", "query", "needle"}
+_START_NAMES = {"start", "source", "src", "begin", "origin"}
+_END_NAMES = {"end", "goal", "dest", "destination", "stop", "finish"}
+_SCALAR_NAMES = {"multiplier", "factor", "threshold", "k", "step", "base", "offset", "scale"}
+_GRAPH_NAMES = {"graph", "adj", "adjacency", "neighbors", "edges"}
+_DICT_NAMES = {"d", "dct", "dict", "mapping", "lookup", "cache", "counts", "config", "index"}
+_MATRIX_NAMES = {"matrix", "grid", "board", "mat", "table"}
+_STR_NAMES = {"s", "text", "string", "word", "sentence", "line", "content"}
+
+_STR_METHODS = {
+    "lower", "upper", "strip", "lstrip", "rstrip", "split", "replace", "startswith",
+    "endswith", "find", "join", "format", "isdigit", "isalpha", "title", "encode",
+}
+_DICT_METHODS = {"items", "keys", "values", "get", "setdefault", "update", "pop"}
+
+_WORDS = ("alpha", "beta", "gamma", "delta", "ERROR", "WARNING", "info", "omega", "key", "value")
+
+# Inputs used when probing whether a kind assignment works
+_PROBE_SIZE = 8
+_PROBE_SECONDS = 0.5
+_MAX_PROBES = 32
+
+# Target per-loop time when auto-ranging calls at one size
+_MIN_LOOP_TIME = 0.005
+_MAX_NUMBER = 1000
+
+# Candidate complexity classes: name -> growth function
+_MODELS: Dict[str, Callable[[float], float]] = {
+    "O(1)": lambda n: 1.0,
+    "O(log n)": lambda n: math.log2(n),
+    "O(n)": lambda n: n,
+    "O(n log n)": lambda n: n * math.log2(n),
+    "O(n^2)": lambda n: n ** 2,
+    "O(n^3)": lambda n: n ** 3,
+}
+
+
+class TreeNode:
+    """Node for snippets that walk trees or linked lists."""
+
+    __slots__ = ("value", "val", "left", "right", "children", "next")
+
+    def __init__(self, value: int):
+        self.value = value
+        self.val = value
+        self.left: Optional["TreeNode"] = None
+        self.right: Optional["TreeNode"] = None
+        self.children: List["TreeNode"] = []
+        self.next: Optional["TreeNode"] = None
+
+    def __repr__(self) -> str:
+        return f"TreeNode({self.value})"
+
+
+# -----------------------
+# STATIC ANALYSIS
+# -----------------------
+
+def _parse(code: str) -> Optional[ast.Module]:
+    try:
+        return ast.parse(code)
+    except SyntaxError:
+        return None
+
+
+def _is_docstring(stmt: ast.stmt) -> bool:
+    return isinstance(stmt, ast.Expr) and isinstance(stmt.value, ast.Constant)
+
+
+def _has_call(node: ast.AST) -> bool:
+    return any(isinstance(child, ast.Call) for child in ast.walk(node))
+
+
+def _top_level_functions(tree: ast.Module) -> List[ast.FunctionDef]:
+    return [stmt for stmt in tree.body if isinstance(stmt, ast.FunctionDef)]
+
+
+def find_entry_points(code: str) -> List[str]:
+    """
+    Public top-level functions not called by any other top-level function,
+    in definition order. Helpers used by an entry point are left out.
+    """
+    tree = _parse(code)
+    if tree is None:
+        return []
+    functions = _top_level_functions(tree)
+    names = {f.name for f in functions}
+    called = set()
+    for func in functions:
+        for node in ast.walk(func):
+            if (
+                isinstance(node, ast.Call)
+                and isinstance(node.func, ast.Name)
+                and node.func.id in names
+                and node.func.id != func.name
+            ):
+                called.add(node.func.id)
+    return [f.name for f in functions if f.name not in called and not f.name.startswith("_")]
+
+
+def is_function_only(code: str) -> bool:
+    """
+    Whether running the snippet only defines things: functions, classes,
+    imports and call-free constants, with at least one entry function.
+    """
+    tree = _parse(code)
+    if tree is None:
+        return False
+    for stmt in tree.body:
+        if isinstance(stmt, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            continue
+        if isinstance(stmt, (ast.Import, ast.ImportFrom, ast.Pass)) or _is_docstring(stmt):
+            continue
+        if isinstance(stmt, (ast.Assign, ast.AnnAssign)) and not _has_call(stmt):
+            continue
+        return False
+    return bool(find_entry_points(code))
+
+
+def _loop_targets(func: ast.FunctionDef, param: str) -> List[str]:
+    """Names bound by iterating directly over `param`."""
+    targets = []
+    for node in ast.walk(func):
+        iters = []
+        if isinstance(node, ast.For):
+            iters.append((node.iter, node.target))
+        elif isinstance(node, ast.comprehension):
+            iters.append((node.iter, node.target))
+        for iterable, target in iters:
+            if isinstance(iterable, ast.Name) and iterable.id == param and isinstance(target, ast.Name):
+                targets.append(target.id)
+    return targets
+
+
+def _usage(func: ast.FunctionDef, name: str) -> Dict[str, Any]:
+    """How a name is used inside a function body."""
+    usage = {
+        "attrs": set(),
+        "subscripted": False,
+        "double_subscripted": False,
+        "string_keys": False,
+        "iterated": False,
+        "numeric": False,
+        "ranged": False,
+        "str_contains": False,
+    }
+
+    def is_name(node: ast.AST) -> bool:
+        return isinstance(node, ast.Name) and node.id == name
+
+    for node in ast.walk(func):
+        if isinstance(node, ast.Attribute) and is_name(node.value):
+            usage["attrs"].add(node.attr)
+        elif isinstance(node, ast.Subscript):
+            if is_name(node.value):
+                usage["subscripted"] = True
+                key = node.slice
+                if isinstance(key, ast.Constant) and isinstance(key.value, str):
+                    usage["string_keys"] = True
+            elif isinstance(node.value, ast.Subscript) and is_name(node.value.value):
+                usage["double_subscripted"] = True
+        elif isinstance(node, (ast.For, ast.comprehension)) and is_name(node.iter):
+            usage["iterated"] = True
+        elif isinstance(node, ast.BinOp) and (is_name(node.left) or is_name(node.right)):
+            other = node.right if is_name(node.left) else node.left
+            if isinstance(other, ast.Constant) and isinstance(other.value, (int, float)):
+                usage["numeric"] = True
+        elif isinstance(node, ast.Compare):
+            operands = [node.left, *node.comparators]
+            if any(is_name(op) for op in operands):
+                if any(
+                    isinstance(op, ast.Constant) and isinstance(op.value, (int, float))
+                    and not isinstance(op.value, bool)
+                    for op in operands
+                ):
+                    usage["numeric"] = True
+                if any(isinstance(o, (ast.In, ast.NotIn)) for o in node.ops) and is_name(node.comparators[0]):
+                    if isinstance(node.left, ast.Constant) and isinstance(node.left.value, str):
+                        usage["str_contains"] = True
+                    usage["iterated"] = True
+        elif isinstance(node, ast.Call) and isinstance(node.func, ast.Name):
+            if any(is_name(arg) for arg in node.args):
+                if node.func.id == "range":
+                    usage["ranged"] = True
+                elif node.func.id in ("len", "sorted", "sum", "enumerate", "list", "set", "max", "min", "zip"):
+                    usage["iterated"] = True
+            elif node.func.id == "range" and any(
+                isinstance(arg, ast.BinOp) and (is_name(arg.left) or is_name(arg.right))
+                for arg in node.args
+            ):
+                usage["ranged"] = True
+    return usage
+
+
+def _element_kind(func: ast.FunctionDef, param: str) -> Optional[str]:
+    """Kind of a collection suggested by how its elements are used."""
+    for target in _loop_targets(func, param):
+        element = _usage(func, target)
+        if element["string_keys"] or element["attrs"] & _DICT_METHODS:
+            return "dict_list"
+        if element["attrs"] & _STR_METHODS or element["str_contains"]:
+            return "str_list"
+        if element["double_subscripted"] or element["subscripted"] or element["iterated"]:
+            return "matrix"
+        if element["numeric"]:
+            return "int_list"
+    return None
+
+
+def _guess_kind(func: ast.FunctionDef, param: str) -> str:
+    usage = _usage(func, param)
+    attrs = usage["attrs"]
+    lowered = param.lower()
+    if lowered in _GRAPH_NAMES:
+        return "graph"
+    if attrs & {"left", "right", "children", "next"}:
+        return "tree"
+    if attrs & _DICT_METHODS or lowered in _DICT_NAMES:
+        return "dict"
+    if usage["double_subscripted"] or lowered in _MATRIX_NAMES or "matri" in func.name.lower():
+        return "matrix"
+    if attrs & _STR_METHODS or lowered in _STR_NAMES:
+        return "str"
+    element = _element_kind(func, param)
+    if element is not None:
+        return element
+    if usage["ranged"] or lowered in _SIZE_NAMES:
+        return "int"
+    if lowered in _MISSING_NAMES:
+        return "missing"
+    if lowered in _START_NAMES:
+        return "start"
+    if lowered in _END_NAMES:
+        return "end"
+    if lowered in _SCALAR_NAMES:
+        return "scalar"
+    if usage["numeric"] and not (usage["iterated"] or usage["subscripted"]):
+        return "int"
+    if lowered.endswith("s") or usage["iterated"] or usage["subscripted"]:
+        return "int_list"
+    return "int_list"
+
+
+def infer_kinds(code: str, function: str) -> List[str]:
+    """Best-guess input kind for each positional parameter of `function`."""
+    tree = _parse(code)
+    if tree is None:
+        return []
+    for func in _top_level_functions(tree):
+        if func.name == function:
+            params = [arg.arg for arg in func.args.posonlyargs + func.args.args]
+            # Parameters with defaults are left to their defaults
+            required = params[: len(params) - len(func.args.defaults)]
+            return [_guess_kind(func, param) for param in required]
+    return []
+
+
+# -----------------------
+# INPUT SYNTHESIS
+# -----------------------
+
+def _build_tree(values: List[int]) -> Optional[TreeNode]:
+    """Balanced binary tree over `values`, with `next` linking nodes in order."""
+    nodes = [TreeNode(v) for v in values]
+    for i, node in enumerate(nodes):
+        left, right = 2 * i + 1, 2 * i + 2
+        if left < len(nodes):
+            node.left = nodes[left]
+        if right < len(nodes):
+            node.right = nodes[right]
+        node.children = [c for c in (node.left, node.right) if c is not None]
+        if i + 1 < len(nodes):
+            node.next = nodes[i + 1]
+    return nodes[0] if nodes else None
+
+
+def synthesize(kind: str, size: int, rng: random.Random, signed: bool = False) -> Any:
+    """
+    One input of the given kind scaled to `size`. Collections hold `size`
+    elements (matrices are square with about `size` cells); "start" and
+    "end" are the first and last index or node, "missing" a value no
+    unsigned collection contains. signed=True also draws negative numbers.
+    """
+    low = -1000 if signed else 0
+    if kind == "int":
+        return size
+    if kind == "scalar":
+        return 2
+    if kind == "missing":
+        return -1
+    if kind == "start":
+        return 0
+    if kind == "end":
+        return size - 1
+    if kind == "int_list":
+        return [rng.randint(low, 1000) for _ in range(size)]
+    if kind == "str":
+        return " ".join(rng.choice(_WORDS) for _ in range(max(size // 6, 1)))[:size]
+    if kind == "str_list":
+        return [f"{rng.choice(_WORDS)} {rng.choice(_WORDS)} {i}" for i in range(size)]
+    if kind == "matrix":
+        side = max(math.isqrt(size), 1)
+        return [[rng.randint(low // 10, 100) for _ in range(side)] for _ in range(side)]
+    if kind == "dict":
+        return {i: rng.randint(low, 1000) for i in range(size)}
+    if kind == "dict_list":
+        return [
+            {"id": i, "value": rng.randint(low, 1000), "name": rng.choice(_WORDS),
+             "data": {"items": [{"value": i}]}}
+            for i in range(size)
+        ]
+    if kind == "graph":
+        return {i: [(i + 1) % size, (i * 7 + 3) % size] for i in range(size)}
+    if kind == "tree":
+        return _build_tree([rng.randint(low, 1000) for _ in range(size)])
+    raise ValueError(f"Unknown input kind: {kind}")
+
+
+def make_args(kinds: List[str], size: int, seed: int, signed: bool = False) -> List[Any]:
+    """Arguments for one call; identical for a given (kinds, size, seed, signed)."""
+    rng = random.Random(seed * 1_000_003 + size)
+    return [synthesize(kind, size, rng, signed) for kind in kinds]
+
+
+# -----------------------
+# IN-CHILD MEASUREMENT
+# -----------------------
+
+def _probe(func: Callable, kinds: List[str], seed: int) -> bool:
+    try:
+        with time_limit(_PROBE_SECONDS):
+            func(*make_args(kinds, _PROBE_SIZE, seed))
+        return True
+    except (Exception, TimeLimitExceeded):
+        return False
+
+
+def choose_kinds(func: Callable, guess: List[str], seed: int) -> Optional[List[str]]:
+    """
+    Start from the inferred kinds; if the probe call fails, try every
+    parameter as the same kind, then each parameter switched to the other
+    kinds in turn.
+    """
+    if _probe(func, guess, seed):
+        return guess
+    probes = 1
+    if len(guess) > 1:
+        for kind in KINDS:
+            probes += 1
+            if _probe(func, [kind] * len(guess), seed):
+                return [kind] * len(guess)
+    for index in range(len(guess)):
+        for kind in KINDS:
+            if kind == guess[index]:
+                continue
+            if probes >= _MAX_PROBES:
+                return None
+            attempt = guess[:index] + [kind] + guess[index + 1:]
+            probes += 1
+            if _probe(func, attempt, seed):
+                return attempt
+    return None
+
+
+def _time_size(
+    func: Callable,
+    kinds: List[str],
+    size: int,
+    seed: int,
+    repeat: int,
+    deadline: float,
+    fixtures=None,
+    gc_monitor: Optional[GCMonitor] = None,
+    call_limit: Optional[float] = None,
+) -> List[float]:
+    """
+    Per-call times at one size. Every call gets its own freshly built
+    (identical) inputs, so in-place algorithms never see sorted data.
+    Inputs are decoded from `fixtures` (see executor.fixtures) when it holds
+    them, else synthesized. Each timed loop is a `gc_monitor` section.
+    With a call_limit the child is killed once calls average longer than
+    that (see executor.harness.kill_after).
+    """
+
+    def build() -> List[Any]:
+        args = fixtures.load(kinds, size, seed) if fixtures is not None else None
+        return args if args is not None else make_args(kinds, size, seed)
+
+    def limit(calls: int):
+        # One interval timer: whichever of the two limits comes first
+        remaining = deadline - time.perf_counter()
+        if call_limit and call_limit * calls < remaining:
+            return kill_after(call_limit * calls)
+        return time_limit(remaining)
+
+    args = build()
+    start = time.perf_counter()
+    with limit(1):
+        func(*args)
+    single = max(time.perf_counter() - start, 1e-7)
+    number = max(1, min(int(_MIN_LOOP_TIME / single), _MAX_NUMBER))
+
+    timings = []
+    for _ in range(repeat):
+        copies = [build() for _ in range(number)]
+        with limit(number), gc_section(gc_monitor, number):
+            start = time.perf_counter()
+            for args in copies:
+                func(*args)
+            elapsed = time.perf_counter() - start
+        timings.append(elapsed / number)
+    return timings
+
+
+def fit_complexity(sizes: List[int], timings: List[float]) -> Optional[Dict[str, Any]]:
+    """
+    Least-squares fit of t = c * g(n) for each class in _MODELS, using
+    relative error so large sizes do not dominate. Returns the best class,
+    its coefficient and relative RMS error, plus the log-log slope.
+    """
+    points = [(n, t) for n, t in zip(sizes, timings) if n > 1 and t > 0]
+    if len(points) < 3:
+        return None
+
+    best = None
+    for name, growth in _MODELS.items():
+        ratios = [growth(n) / t for n, t in points]
+        coefficient = sum(ratios) / sum(r * r for r in ratios)
+        error = math.sqrt(sum((coefficient * r - 1) ** 2 for r in ratios) / len(ratios))
+        # Classes go from slow- to fast-growing; a faster-growing one has to
+        # fit clearly better, so small-size noise does not inflate the class
+        if best is None or error < 0.8 * best["error"]:
+            best = {"complexity": name, "coefficient": coefficient, "error": error}
+
+    logs = [(math.log(n), math.log(t)) for n, t in points]
+    mean_x = statistics.fmean(x for x, _ in logs)
+    mean_y = statistics.fmean(y for _, y in logs)
+    var_x = sum((x - mean_x) ** 2 for x, _ in logs)
+    best["slope"] = (
+        sum((x - mean_x) * (y - mean_y) for x, y in logs) / var_x if var_x > 0 else 0.0
+    )
+    return best
+
+
+def predict(fit: Dict[str, Any], size: int) -> float:
+    return fit["coefficient"] * _MODELS[fit["complexity"]](size)
+
+
+def measure_scaling(
+    namespace: Dict[str, Any],
+    code: str,
+    spec: Dict[str, Any],
+    sizes: List[int],
+    target_size: int,
+    repeat: int,
+    size_budget: float,
+    budget: float,
+    seed: int = 0,
+    fixtures=None,
+    gc_mode: str = "enabled",
+    call_limit: Optional[float] = None,
+) -> Dict[str, Any]:
+    """
+    Time the snippet's entry function over growing input sizes.
+
+    `spec` may pin the function name and argument kinds (from a baseline
+    run) so a candidate is measured on exactly the same inputs; a renamed
+    function falls back to the candidate's own first entry point. Sizes stop
+    growing once one size takes more than `size_budget` seconds, a call
+    fails, or `budget` runs out.
+
+    Returns the measured series, the fitted class and the per-call time at
+    the target size (measured when reached, extrapolated otherwise), plus
+    the spec to reuse for candidates. `fixtures` optionally supplies the
+    pre-built inputs for the spec's kinds. Collector activity at the target
+    size is reported under "gc" (see GCMonitor for gc_mode). call_limit
+    (seconds per call) kills the child when calls at sizes up to the target
+    run longer; larger sizes only feed the fit and may legitimately do so.
+    """
+    entry_points = find_entry_points(code)
+    name = spec.get("function")
+    if name not in namespace or not callable(namespace.get(name)):
+        name = entry_points[0] if entry_points else None
+    if name is None:
+        return {"error": "No entry function found"}
+    func = namespace[name]
+
+    kinds = spec.get("kinds")
+    inferred = infer_kinds(code, name)
+    if not kinds or len(kinds) != len(inferred):
+        kinds = inferred
+    pinned_target = "target_size" in spec
+    target_size = int(spec.get("target_size", target_size))
+
+    saved_stdout = sys.stdout
+    sys.stdout = open(os.devnull, "w")
+    measured_sizes: List[int] = []
+    per_size: List[List[float]] = []
+    per_size_gc: List[GCMonitor] = []
+    stopped = None
+    try:
+        chosen = choose_kinds(func, kinds, seed)
+        if chosen is None:
+            return {"error": f"Could not synthesize inputs for {name}()", "function": name, "kinds": kinds}
+        kinds = chosen
+
+        deadline = time.perf_counter() + budget
+        for size in sizes:
+            if time.perf_counter() >= deadline:
+                stopped = "budget"
+                break
+            start = time.perf_counter()
+            monitor = GCMonitor(gc_mode)
+            try:
+                per_size.append(_time_size(
+                    func, kinds, size, seed, repeat, deadline, fixtures, monitor,
+                    call_limit if size <= target_size else None,
+                ))
+            except TimeLimitExceeded:
+                stopped = "budget"
+                break
+            except Exception as e:
+                stopped = f"{type(e).__name__} at size {size}"
+                break
+            measured_sizes.append(size)
+            per_size_gc.append(monitor)
+            if time.perf_counter() - start > size_budget:
+                stopped = "size_budget"
+                break
+    finally:
+        sys.stdout.close()
+        sys.stdout = saved_stdout
+
+    if not measured_sizes:
+        return {"error": f"No input size completed ({stopped})", "function": name, "kinds": kinds}
+
+    medians = [statistics.median(t) for t in per_size]
+    fit = fit_complexity(measured_sizes, medians)
+    target_gc = None
+    if target_size in measured_sizes:
+        target_timings = per_size[measured_sizes.index(target_size)]
+        target_runtime = statistics.median(target_timings)
+        target_gc = per_size_gc[measured_sizes.index(target_size)].report()
+        extrapolated = False
+    elif pinned_target and target_size > measured_sizes[-1]:
+        # Compared against a baseline at this size: extrapolate, assuming
+        # at least linear growth when there are too few points to fit
+        target_timings = []
+        if fit is not None:
+            target_runtime = max(predict(fit, target_size), medians[-1])
+        else:
+            target_runtime = medians[-1] * target_size / measured_sizes[-1]
+        extrapolated = True
+    else:
+        # Settle for the largest size that completed
+        target_size = measured_sizes[-1]
+        target_timings = per_size[-1]
+        target_runtime = medians[-1]
+        target_gc = per_size_gc[-1].report()
+        extrapolated = False
+
+    return {
+        "function": name,
+        "kinds": kinds,
+        "sizes": measured_sizes,
+        "timings": medians,
+        "stopped": stopped,
+        "fit": fit,
+        "target_size": target_size,
+        "target_runtime": target_runtime,
+        "target_timings": target_timings,
+        "extrapolated": extrapolated,
+        "gc": target_gc,
+        "spec": {"function": name, "kinds": kinds, "target_size": target_size},
+    }
@@ -0,0 +1,159 @@
+"""
+Remote sandbox worker daemon.
+
+Serves the sandbox over a Unix or TCP socket so execution capacity can be
+added independently of the API nodes:
+
+    python -m executor.daemon --listen unix:/run/sandbox.sock
+    SANDBOX_REMOTE_TOKEN=... python -m executor.daemon --listen tcp:0.0.0.0:7700
+
+It listens on 127.0.0.1 by default and refuses a TCP address reachable from
+other hosts unless a token is set, since a run request executes arbitrary code.
+
+Each connection carries length-prefixed JSON frames (executor.protocol), one
+request and one response at a time:
+
+    {"op": "health"}                          -> capacity, load and identity
+    {"op": "run", "request": {...}, "timeout": t}  -> fork-server response
+
+Runs go through the daemon's own WorkerPool, so they are admitted, queued and
+core-pinned exactly as on a local host. Clients live in executor.remote.
+"""
+import argparse
+import asyncio
+import hmac
+import ipaddress
+import os
+import signal
+from typing import Dict, Any, Optional
+import structlog
+
+from executor.fingerprint import fingerprint_id
+from executor.harness import HARNESS_VERSION
+from executor.pool import WorkerPool, WorkerError
+from executor.protocol import encode_frame, parse_address, read_frame_async
+from executor.scheduler import pin_host_process
+from shared.config import SANDBOX_POOL_SIZE, SANDBOX_REMOTE_TOKEN
+
+logger = structlog.get_logger()
+
+DEFAULT_LISTEN = "tcp:127.0.0.1:7700"
+
+
+def _is_loopback(host: str) -> bool:
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        # A hostname or "" (all interfaces): assume it is reachable
+        return False
+
+
+class SandboxDaemon:
+    """Answers health checks and runs requests on a local WorkerPool."""
+
+    def __init__(self, pool_size: int = SANDBOX_POOL_SIZE, token: Optional[str] = SANDBOX_REMOTE_TOKEN):
+        self.pool = WorkerPool(pool_size)
+        self.token = token
+        self.active = 0
+        self.served = 0
+
+    def health(self) -> Dict[str, Any]:
+        capacity = self.pool.scheduler.capacity
+        return {
+            "ok": True,
+            "capacity": capacity,
+            "active": min(self.active, capacity),
+            "queued": max(self.active - capacity, 0),
+            "served": self.served,
+            "load": os.getloadavg()[0] if hasattr(os, "getloadavg") else None,
+            "machine_id": fingerprint_id(),
+            "harness_version": HARNESS_VERSION,
+        }
+
+    def _authorized(self, message: Dict[str, Any]) -> bool:
+        if not self.token:
+            return True
+        return hmac.compare_digest(str(message.get("token") or ""), self.token)
+
+    async def handle(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        if not self._authorized(message):
+            return {"error": "Unauthorized"}
+        op = message.get("op")
+        if op == "health":
+            return self.health()
+        if op != "run" or not isinstance(message.get("request"), dict):
+            return {"error": f"Unknown operation {op!r}"}
+
+        self.active += 1
+        try:
+            return await self.pool.run(message["request"], float(message.get("timeout") or 0))
+        except WorkerError as e:
+            return {"error": str(e)}
+        finally:
+            self.active -= 1
+            self.served += 1
+
+    async def serve_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        peer = writer.get_extra_info("peername")
+        try:
+            while True:
+                try:
+                    message = await read_frame_async(reader)
+                except ValueError as e:
+                    # Oversized or malformed frame: the stream can't be resynced
+                    logger.warning("Bad frame from client", peer=peer, error=str(e))
+                    break
+                if message is None:
+                    break
+                writer.write(encode_frame(await self.handle(message)))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, address: str) -> None:
+        kind, target = parse_address(address)
+        if kind == "tcp" and not self.token and not _is_loopback(target[0]):
+            raise ValueError(f"Refusing to listen on {address} without a token (set SANDBOX_REMOTE_TOKEN)")
+        if kind == "unix":
+            if os.path.exists(target):
+                os.unlink(target)
+            server = await asyncio.start_unix_server(self.serve_connection, path=target)
+        else:
+            host, port = target
+            server = await asyncio.start_server(self.serve_connection, host=host, port=port)
+        # Shut down cleanly (workers killed, socket removed) on SIGTERM too
+        loop = asyncio.get_running_loop()
+        task = asyncio.current_task()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(sig, task.cancel)
+        logger.info("Sandbox daemon listening", address=address, capacity=self.pool.scheduler.capacity)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.pool.close()
+            if kind == "unix" and os.path.exists(target):
+                os.unlink(target)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve the code sandbox over a socket.")
+    parser.add_argument("--listen", default=DEFAULT_LISTEN, help="unix:PATH or tcp:HOST:PORT")
+    parser.add_argument("--workers", type=int, default=SANDBOX_POOL_SIZE, help="warm fork-server workers")
+    parser.add_argument("--token", default=SANDBOX_REMOTE_TOKEN, help="shared secret clients must send")
+    args = parser.parse_args()
+    pin_host_process()
+    try:
+        asyncio.run(SandboxDaemon(args.workers, args.token).serve(args.listen))
+    except ValueError as e:
+        parser.error(str(e))
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        logger.info("Sandbox daemon stopped", address=args.listen)
+
+
+if __name__ == "__main__":
+    main()
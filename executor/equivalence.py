@@ -0,0 +1,146 @@
+"""
+Differential fuzzing of a candidate against its baseline.
+
+Both snippets are defined side by side in one warm sandbox child and their
+entry functions are called on the same batch of synthesized inputs (see
+executor.complexity), small and with negative numbers mixed in. Outputs
+are compared structurally and the check stops at the first mismatch, so a
+candidate that changes behaviour is rejected before it is benchmarked or
+shown to the critic.
+"""
+import os
+import sys
+import time
+from collections.abc import Iterator
+from typing import Dict, Any, List, Optional
+
+from executor.complexity import choose_kinds, infer_kinds, make_args
+from executor.harness import TimeLimitExceeded, seed_rngs, time_limit
+from executor.suite import Incomparable, outputs_match, resolve_function
+
+# Input sizes cycled through by the trials; edge cases first
+_SIZES = (0, 1, 2, 3, 5, 8, 13, 20)
+
+# Wall-clock cap on one call of either side
+_CALL_TIMEOUT = 1.0
+
+# Longest repr kept when reporting a mismatch
+_REPR_LIMIT = 300
+
+
+def _short(value: Any) -> str:
+    text = repr(value)
+    return text if len(text) <= _REPR_LIMIT else text[:_REPR_LIMIT] + "..."
+
+
+def _call(func, args: List[Any], seed: int) -> Dict[str, Any]:
+    """Outcome of one call: its return value and arguments afterwards, or the error."""
+    seed_rngs(seed)
+    try:
+        with time_limit(_CALL_TIMEOUT):
+            value = func(*args)
+            # Lazy results do their work when consumed: do it under the limit
+            if isinstance(value, Iterator):
+                value = list(value)
+        return {"value": value, "args": args}
+    except TimeLimitExceeded:
+        return {"error": "timed out"}
+    except Exception as e:
+        return {"error": f"{type(e).__name__}: {e}"}
+
+
+def _same(baseline: Dict[str, Any], candidate: Dict[str, Any]) -> Optional[bool]:
+    """Whether two outcomes match; None when they cannot be compared."""
+    try:
+        if not outputs_match(candidate["value"], baseline["value"]):
+            return False
+        # In-place functions (returning None) are judged by their arguments
+        if baseline["value"] is None:
+            return outputs_match(candidate["args"], baseline["args"])
+        return True
+    except (Incomparable, RecursionError, ValueError):
+        # Functions, cyclic structures, objects with an ambiguous truth
+        # value: do not hold them against the candidate
+        return None
+
+
+def check_equivalence(
+    baseline_ns: Dict[str, Any],
+    baseline_code: str,
+    candidate_ns: Dict[str, Any],
+    candidate_code: str,
+    spec: Dict[str, Any],
+    trials: int,
+    budget: float,
+    seed: int = 0,
+) -> Dict[str, Any]:
+    """
+    Call the baseline and candidate entry functions on `trials` generated
+    inputs. Trials where the baseline itself fails are outside its domain
+    and skipped, as are trials whose results cannot be compared (e.g.
+    functions); otherwise the candidate must return an equal value (and
+    leave equal arguments when the baseline works in place). Returned
+    iterators and generators are compared by the items they produce.
+
+    "equivalent" is False with details of the first mismatch, True when
+    every compared trial matched, and None when nothing could be compared
+    (no entry function, no usable inputs).
+    """
+    name = spec.get("function")
+    baseline = resolve_function(baseline_ns, baseline_code, name)
+    if baseline is None:
+        return {"equivalent": None, "reason": "No entry function in baseline"}
+    candidate = resolve_function(candidate_ns, candidate_code, baseline.__name__)
+    if candidate is None:
+        return {"equivalent": False, "reason": f"Candidate has no {baseline.__name__}() or other entry function"}
+
+    saved_stdout = sys.stdout
+    sys.stdout = open(os.devnull, "w")
+    compared = 0
+    skipped = 0
+    try:
+        kinds = spec.get("kinds") or infer_kinds(baseline_code, baseline.__name__)
+        kinds = choose_kinds(baseline, kinds, seed)
+        if kinds is None:
+            return {"equivalent": None, "reason": f"Could not synthesize inputs for {baseline.__name__}()"}
+
+        deadline = time.perf_counter() + budget
+        for trial in range(trials):
+            if time.perf_counter() >= deadline:
+                break
+            size = _SIZES[trial % len(_SIZES)]
+            signed = trial % 2 == 1
+            # Each side gets its own identical copy of the inputs
+            expected = _call(baseline, make_args(kinds, size, seed + trial, signed), seed + trial)
+            if "error" in expected:
+                skipped += 1
+                continue
+            actual = _call(candidate, make_args(kinds, size, seed + trial, signed), seed + trial)
+            same = False if "error" in actual else _same(expected, actual)
+            if same is None:
+                skipped += 1
+                continue
+            compared += 1
+            if not same:
+                return {
+                    "equivalent": False,
+                    "trials": compared,
+                    "skipped": skipped,
+                    "kinds": kinds,
+                    "mismatch": {
+                        "trial": trial,
+                        "input": _short(make_args(kinds, size, seed + trial, signed)),
+                        "expected": _short(expected["value"]),
+                        "actual": actual.get("error") or _short(actual["value"]),
+                    },
+                }
+    finally:
+        sys.stdout.close()
+        sys.stdout = saved_stdout
+
+    return {
+        "equivalent": True if compared else None,
+        "trials": compared,
+        "skipped": skipped,
+        "kinds": kinds,
+    }
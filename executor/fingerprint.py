@@ -0,0 +1,46 @@
+"""
+Host fingerprint used to keep benchmark results from different machines apart.
+"""
+import functools
+import hashlib
+import json
+import os
+import platform
+from typing import Dict, Any
+
+
+def _cpu_model() -> str:
+    try:
+        with open("/proc/cpuinfo") as f:
+            for line in f:
+                if line.startswith("model name"):
+                    return line.split(":", 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor() or "unknown"
+
+
+@functools.lru_cache(maxsize=1)
+def machine_fingerprint() -> Dict[str, Any]:
+    """Hardware and interpreter details that affect benchmark results."""
+    return {
+        "cpu_model": _cpu_model(),
+        "cpu_count": os.cpu_count(),
+        "machine": platform.machine(),
+        "system": platform.system(),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "hostname": platform.node(),
+    }
+
+
+@functools.lru_cache(maxsize=1)
+def fingerprint_id() -> str:
+    """
+    Short stable hash of the fingerprint.
+    The hostname is left out so identical nodes (and restarted containers,
+    which get new hostnames) share results.
+    """
+    details = {k: v for k, v in machine_fingerprint().items() if k != "hostname"}
+    digest = hashlib.sha256(json.dumps(details, sort_keys=True).encode())
+    return digest.hexdigest()[:16]
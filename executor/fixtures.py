@@ -0,0 +1,130 @@
+"""
+Shared-memory input fixtures for function-only benchmarks.
+
+The host synthesizes the arguments for every benchmark size once per
+workload (see executor.complexity.make_args) and writes them, pickled, to a
+file in RAM-backed scratch space. Sandbox children map that file read-only
+and decode a fresh copy of the arguments for each call, so the baseline and
+every candidate are timed on byte-identical inputs without regenerating
+them. Fixtures are keyed by content and kept in a small LRU for the life of
+the host process.
+"""
+import atexit
+import hashlib
+import json
+import mmap
+import os
+import pickle
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional
+import structlog
+
+from executor.complexity import make_args
+from executor.scratch import scratch_root
+from shared.config import FIXTURE_CACHE_SIZE, FIXTURE_MAX_BYTES
+
+logger = structlog.get_logger()
+
+# Same prefix as executor.scratch so files of dead hosts get swept
+_PREFIX = "sandbox-"
+
+
+def _build(path: str, kinds: List[str], sizes: List[int], seed: int) -> Dict[str, Any]:
+    """Write the fixture file; returns the handle sent to sandbox children."""
+    index: Dict[str, List[int]] = {}
+    offset = 0
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        for size in sorted(set(sizes)):
+            blob = pickle.dumps(make_args(kinds, size, seed), protocol=pickle.HIGHEST_PROTOCOL)
+            if offset + len(blob) > FIXTURE_MAX_BYTES:
+                break
+            f.write(blob)
+            index[str(size)] = [offset, len(blob)]
+            offset += len(blob)
+    os.replace(tmp, path)
+    return {"path": path, "kinds": kinds, "seed": seed, "index": index, "bytes": offset}
+
+
+class FixtureStore:
+    """Host-side LRU of fixture files, one per (kinds, sizes, seed)."""
+
+    def __init__(self, max_entries: int = FIXTURE_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._handles: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        atexit.register(self.clear)
+
+    def get(self, kinds: List[str], sizes: List[int], seed: int = 0) -> Optional[Dict[str, Any]]:
+        """The handle for these inputs, building the file on first use."""
+        key = hashlib.sha256(
+            json.dumps([kinds, sorted(set(sizes)), seed]).encode()
+        ).hexdigest()[:16]
+        handle = self._handles.get(key)
+        if handle is not None and os.path.exists(handle["path"]):
+            self._handles.move_to_end(key)
+            return handle
+
+        path = os.path.join(scratch_root(), f"{_PREFIX}{os.getpid()}-fixture-{key}")
+        try:
+            handle = _build(path, kinds, sizes, seed)
+        except Exception as e:
+            # Unsynthesizable kinds or no scratch space: children generate inputs
+            logger.warning("Could not build input fixtures", kinds=kinds, error=str(e))
+            return None
+        self._handles[key] = handle
+        while len(self._handles) > self.max_entries:
+            _, evicted = self._handles.popitem(last=False)
+            _unlink(evicted["path"])
+        return handle
+
+    def clear(self) -> None:
+        while self._handles:
+            _, handle = self._handles.popitem()
+            _unlink(handle["path"])
+
+
+def _unlink(path: str) -> None:
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+_store: Optional[FixtureStore] = None
+
+
+def get_fixture_store() -> FixtureStore:
+    global _store
+    if _store is None:
+        _store = FixtureStore()
+    return _store
+
+
+class FixtureReader:
+    """Child-side read-only mapping of a fixture file."""
+
+    def __init__(self, handle: Dict[str, Any]):
+        self.kinds = list(handle["kinds"])
+        self.seed = handle["seed"]
+        self.index = {int(size): span for size, span in handle["index"].items()}
+        with open(handle["path"], "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._map)
+
+    def load(self, kinds: List[str], size: int, seed: int) -> Optional[List[Any]]:
+        """A fresh copy of the arguments, or None when these inputs are not stored."""
+        span = self.index.get(size)
+        if span is None or kinds != self.kinds or seed != self.seed:
+            return None
+        offset, length = span
+        return pickle.loads(self._view[offset:offset + length])
+
+
+def attach_fixtures(handle: Optional[Dict[str, Any]]) -> Optional[FixtureReader]:
+    """Map a fixture file in the sandbox child; None when unavailable."""
+    if not handle:
+        return None
+    try:
+        return FixtureReader(handle)
+    except (OSError, ValueError, KeyError):
+        return None
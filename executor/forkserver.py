@@ -0,0 +1,627 @@
+"""
+Pre-warmed sandbox worker.
+
+Run as ``python -m executor.forkserver``. The worker imports the allowed
+modules once, then reads execution requests from stdin and forks a fresh
+child for each one, so user code never pays interpreter or numpy startup.
+"""
+import ast
+import importlib
+import io
+import json
+import os
+import random
+import resource
+import selectors
+import shutil
+import signal
+import sys
+import tempfile
+import time
+import traceback
+from typing import Callable, Dict, Any, Optional, Tuple
+
+from executor.harness import (
+    fresh_namespace,
+    time_limit,
+    TimeLimitExceeded,
+    kill_after,
+    measure,
+    measure_paired,
+    trace_allocations,
+    count_operations,
+    profile_hotspots,
+    line_profile,
+)
+from executor.complexity import make_args, measure_scaling
+from executor.suite import measure_driver, resolve_function, run_test_cases
+from executor.equivalence import check_equivalence
+from executor.fixtures import attach_fixtures
+from executor.capture import BoundedCapture
+from executor.protocol import encode_frame, read_frame
+from executor.scratch import make_scratch_dir, wipe
+from shared.config import (
+    HARNESS_MIN_TIME,
+    BENCHMARK_WARMUP,
+    BENCHMARK_MIN_SAMPLES,
+    BENCHMARK_MAX_SAMPLES,
+    BENCHMARK_CI_TARGET,
+    BENCHMARK_TIME_BUDGET,
+    BENCHMARK_GC_MODE,
+    TRACEMALLOC_TOP_N,
+    PROFILE_TOP_N,
+    LINE_PROFILE_MAX_EVENTS,
+    COST_MAX_INSTRUCTIONS,
+    COMPLEXITY_SIZES,
+    COMPLEXITY_TARGET_SIZE,
+    COMPLEXITY_REPEAT,
+    COMPLEXITY_SIZE_BUDGET,
+    EQUIVALENCE_TRIALS,
+    OUTPUT_CAPTURE_LIMIT,
+)
+from shared.sanitize import ALLOWED_IMPORTS
+
+# Upper bound on a single read from a child pipe
+_READ_CHUNK = 65536
+
+# ru_maxrss is reported in kilobytes on Linux and bytes on macOS
+_MAXRSS_PER_MB = 1024 * 1024 if sys.platform == "darwin" else 1024
+
+# Peak RSS of a child that runs nothing; set by calibrate_baseline_rss()
+_baseline_rss_mb = 0.0
+
+# Seconds each allowed module took to import at worker start; set by
+# preload_modules(). Children inherit them warm, a cold interpreter would not.
+_import_times: Dict[str, float] = {}
+
+
+def _reseed() -> None:
+    """Give each child fresh randomness, as a cold interpreter would have."""
+    random.seed()
+    numpy = sys.modules.get("numpy")
+    if numpy is not None:
+        numpy.random.seed()
+
+
+def preload_modules() -> None:
+    """Import the allowed modules so forked children inherit them warm."""
+    for name in ALLOWED_IMPORTS:
+        already_loaded = name in sys.modules
+        start = time.perf_counter()
+        try:
+            importlib.import_module(name)
+        except Exception:
+            # Optional heavy dependencies (e.g. pandas) may not be installed
+            continue
+        # Dependencies shared with an earlier module are charged to that one
+        _import_times[name] = 0.0 if already_loaded else time.perf_counter() - start
+    # First reseed pays numpy's lazy initialisation; do it once here
+    _reseed()
+
+
+def _import_cost(code: str) -> Dict[str, Any]:
+    """
+    What the snippet's imports would cost a cold interpreter: the worker's
+    own start-up import time of each preloaded module it imports.
+    """
+    imports: Dict[str, float] = {}
+    for node in ast.walk(ast.parse(code)):
+        if isinstance(node, ast.Import):
+            names = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names = [node.module]
+        else:
+            continue
+        for name in names:
+            root = name.split(".")[0]
+            if root in _import_times:
+                imports[root] = _import_times[root]
+    return {"imports": imports, "import_time": sum(imports.values(), 0.0)}
+
+
+def _exit_code(e: SystemExit) -> int:
+    if e.code is None:
+        return 0
+    if isinstance(e.code, int):
+        return e.code
+    print(e.code, file=sys.stderr)
+    return 1
+
+
+def _rusage_dict(rusage) -> Dict[str, Any]:
+    return {
+        "max_rss_mb": rusage.ru_maxrss / _MAXRSS_PER_MB,
+        "baseline_rss_mb": _baseline_rss_mb,
+        "user_time": rusage.ru_utime,
+        "system_time": rusage.ru_stime,
+        "minor_faults": rusage.ru_minflt,
+        "major_faults": rusage.ru_majflt,
+        "voluntary_switches": rusage.ru_nvcsw,
+        "involuntary_switches": rusage.ru_nivcsw,
+    }
+
+
+def calibrate_baseline_rss() -> None:
+    """
+    Measure the peak RSS of an idle forked child.
+    Reported memory is peak RSS above this floor, so the pre-warmed
+    interpreter itself does not count against the snippet.
+    """
+    global _baseline_rss_mb
+    pid = os.fork()
+    if pid == 0:
+        os._exit(0)
+    _, _, rusage = os.wait4(pid, 0)
+    _baseline_rss_mb = rusage.ru_maxrss / _MAXRSS_PER_MB
+
+
+def _run_paired(request: Dict[str, Any], metrics: Dict[str, Any]) -> int:
+    """Interleaved A/B timing of request["code"] against request["candidate"]."""
+    try:
+        baseline_obj = compile(request["code"], "<baseline>", "exec")
+        candidate_obj = compile(request["candidate"], "<candidate>", "exec")
+    except SyntaxError:
+        traceback.print_exc()
+        return 1
+
+    budget = min(
+        float(request.get("budget", 2 * BENCHMARK_TIME_BUDGET)),
+        float(request.get("timeout", 15)) * 0.5,
+    )
+    result = measure_paired(
+        baseline_obj,
+        candidate_obj,
+        request.get("stdin"),
+        seed=int(request.get("seed", 0)),
+        min_time=float(request.get("min_time", HARNESS_MIN_TIME)),
+        min_samples=int(request.get("min_samples", BENCHMARK_MIN_SAMPLES)),
+        max_samples=int(request.get("max_samples", BENCHMARK_MAX_SAMPLES)),
+        ci_target=float(request.get("ci_target", BENCHMARK_CI_TARGET)),
+        budget=budget,
+        gc_mode=request.get("gc_mode", BENCHMARK_GC_MODE),
+    )
+    metrics["paired"] = result
+    if "error" in result:
+        print(result["error"], file=sys.stderr)
+        return 1
+    return 0
+
+
+def _run_equivalence(request: Dict[str, Any], metrics: Dict[str, Any]) -> int:
+    """Differential fuzzing of request["candidate"] against request["code"]."""
+    budget = min(
+        float(request.get("budget", BENCHMARK_TIME_BUDGET)),
+        float(request.get("timeout", 15)) * 0.5,
+    )
+    namespaces = []
+    for side, source in (("baseline", request["code"]), ("candidate", request["candidate"])):
+        namespace = fresh_namespace()
+        try:
+            with time_limit(budget):
+                exec(compile(source, f"<{side}>", "exec"), namespace)
+        except SystemExit:
+            pass
+        except (Exception, TimeLimitExceeded) as e:
+            # A candidate that cannot even be defined is not equivalent
+            metrics["equivalence"] = {
+                "equivalent": None if side == "baseline" else False,
+                "reason": f"{side} failed to run: {type(e).__name__}: {e}",
+            }
+            return 0
+        namespaces.append(namespace)
+
+    metrics["equivalence"] = check_equivalence(
+        namespaces[0],
+        request["code"],
+        namespaces[1],
+        request["candidate"],
+        request["equivalence"].get("spec") or {},
+        trials=int(request["equivalence"].get("trials", EQUIVALENCE_TRIALS)),
+        budget=budget,
+    )
+    return 0
+
+
+def _profile_target(
+    request: Dict[str, Any],
+    namespace: Dict[str, Any],
+    code_obj,
+    metrics: Dict[str, Any],
+) -> Callable[[], Any]:
+    """
+    What the diagnostic passes run: the work that was timed. That is the
+    entry function on the target-size input for function-only snippets
+    (the largest completed one when the target was only extrapolated, see
+    _unreached_target), the driver at its largest size for a suite, else the
+    whole snippet. The callable returns what it built, so allocation tracing
+    sees it live.
+    """
+    complexity = metrics.get("complexity")
+    if complexity and "error" not in complexity:
+        func = resolve_function(namespace, request["code"], complexity["function"])
+        size = complexity["sizes"][-1] if complexity["extrapolated"] else complexity["target_size"]
+        args = make_args(complexity["kinds"], size, seed=0)
+        return lambda: func(*args)
+
+    suite = request.get("suite") or {}
+    if suite.get("driver"):
+        # measure_driver already rejected drivers that do not compile
+        driver_obj = compile(suite["driver"], "<driver>", "exec")
+        base = dict(namespace)
+        if suite.get("sizes"):
+            base["n"] = suite["sizes"][-1]
+
+        def run_driver() -> Dict[str, Any]:
+            driver_namespace = dict(base)
+            exec(driver_obj, driver_namespace)
+            return driver_namespace
+
+        return run_driver
+
+    stdin_data = request.get("stdin")
+
+    def run_snippet() -> Dict[str, Any]:
+        if stdin_data is not None:
+            sys.stdin = io.StringIO(stdin_data)
+        snippet_namespace = fresh_namespace()
+        try:
+            exec(code_obj, snippet_namespace)
+        except SystemExit:
+            pass
+        return snippet_namespace
+
+    return run_snippet
+
+
+def _unreached_target(metrics: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Stand-in for cost and allocation figures when the entry function never
+    completed the pinned target size: counted on a smaller input they would
+    not be comparable with the baseline's, so they are left out.
+    """
+    complexity = metrics.get("complexity")
+    if not complexity or not complexity.get("extrapolated"):
+        return None
+    return {
+        "error": f"Target size {complexity['target_size']} not reached "
+                 f"(largest completed: {complexity['sizes'][-1]})",
+        "comparable": False,
+    }
+
+
+def _run_child(request: Dict[str, Any], metrics: Dict[str, Any]) -> int:
+    """
+    Execute the user code in the forked child and return its exit code.
+    Structured measurements are added to `metrics`.
+    """
+    if request.get("equivalence"):
+        return _run_equivalence(request, metrics)
+    if request.get("candidate") is not None:
+        return _run_paired(request, metrics)
+
+    _reseed()
+    start = time.perf_counter()
+    try:
+        code_obj = compile(request["code"], "<sandbox>", "exec")
+    except SyntaxError:
+        traceback.print_exc()
+        return 1
+    metrics["compile_time"] = time.perf_counter() - start
+    metrics["setup"] = _import_cost(request["code"])
+
+    # run_limit caps the first run, call_limit each execution of the timed work
+    call_limit = request.get("call_limit")
+    namespace = fresh_namespace()
+    try:
+        # Also cleared after sys.exit(0): later passes must not run under the timer
+        with kill_after(request.get("run_limit")):
+            start = time.perf_counter()
+            exec(code_obj, namespace)
+            metrics["first_run"] = time.perf_counter() - start
+    except SystemExit as e:
+        exit_code = _exit_code(e)
+        if exit_code != 0:
+            return exit_code
+    except BaseException as e:
+        # Drop this frame so the traceback starts in the user's code
+        traceback.print_exception(type(e), e, e.__traceback__.tb_next)
+        return 1
+
+    if request.get("harness"):
+        sys.stdout.flush()
+        # Leave headroom so the worker never has to kill a measuring child
+        budget = min(
+            float(request.get("budget", BENCHMARK_TIME_BUDGET)),
+            float(request.get("timeout", 15)) * 0.5,
+        )
+        metrics["harness"] = measure(
+            code_obj,
+            request.get("stdin"),
+            min_time=float(request.get("min_time", HARNESS_MIN_TIME)),
+            warmup=int(request.get("warmup", BENCHMARK_WARMUP)),
+            min_samples=int(request.get("min_samples", BENCHMARK_MIN_SAMPLES)),
+            max_samples=int(request.get("max_samples", BENCHMARK_MAX_SAMPLES)),
+            ci_target=float(request.get("ci_target", BENCHMARK_CI_TARGET)),
+            budget=budget,
+            gc_mode=request.get("gc_mode", BENCHMARK_GC_MODE),
+            call_limit=call_limit,
+        )
+
+    if request.get("complexity") is not None:
+        # The first run defined the functions; call them on synthesized inputs
+        sys.stdout.flush()
+        metrics["complexity"] = measure_scaling(
+            namespace,
+            request["code"],
+            request["complexity"],
+            sizes=list(request.get("sizes", COMPLEXITY_SIZES)),
+            target_size=int(request.get("target_size", COMPLEXITY_TARGET_SIZE)),
+            repeat=int(request.get("repeat", COMPLEXITY_REPEAT)),
+            size_budget=float(request.get("size_budget", COMPLEXITY_SIZE_BUDGET)),
+            budget=min(
+                float(request.get("budget", BENCHMARK_TIME_BUDGET)),
+                float(request.get("timeout", 15)) * 0.5,
+            ),
+            fixtures=attach_fixtures(request.get("fixtures")),
+            gc_mode=request.get("gc_mode", BENCHMARK_GC_MODE),
+            call_limit=call_limit,
+        )
+
+    suite = request.get("suite") or {}
+    if suite.get("driver"):
+        # Only the user's driver is timed, on top of the snippet's definitions
+        sys.stdout.flush()
+        metrics["driver"] = measure_driver(
+            namespace,
+            suite,
+            request.get("stdin"),
+            min_time=float(request.get("min_time", HARNESS_MIN_TIME)),
+            warmup=int(request.get("warmup", BENCHMARK_WARMUP)),
+            min_samples=int(request.get("min_samples", BENCHMARK_MIN_SAMPLES)),
+            max_samples=int(request.get("max_samples", BENCHMARK_MAX_SAMPLES)),
+            ci_target=float(request.get("ci_target", BENCHMARK_CI_TARGET)),
+            budget=min(
+                float(request.get("budget", BENCHMARK_TIME_BUDGET)),
+                float(request.get("timeout", 15)) * 0.5,
+            ),
+            gc_mode=request.get("gc_mode", BENCHMARK_GC_MODE),
+            call_limit=call_limit,
+        )
+        if "error" in metrics["driver"]:
+            print(metrics["driver"]["error"], file=sys.stderr)
+            return 1
+
+    if suite.get("test_cases"):
+        metrics["tests"] = run_test_cases(namespace, request["code"], code_obj, suite)
+
+    # Peak RSS of the run and its timing loops, read before the diagnostic
+    # passes below (tracemalloc alone roughly doubles it) can raise it
+    metrics["measured_rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / _MAXRSS_PER_MB
+
+    if request.get("profile"):
+        # Separate pass so profiler overhead never leaks into the timings
+        sys.stdout.flush()
+        metrics["profile"] = profile_hotspots(
+            _profile_target(request, namespace, code_obj, metrics),
+            top_n=int(request.get("profile_top_n", PROFILE_TOP_N)),
+        )
+
+    if request.get("line_profile"):
+        sys.stdout.flush()
+        metrics["line_profile"] = line_profile(
+            _profile_target(request, namespace, code_obj, metrics),
+            filename=code_obj.co_filename,
+            max_events=int(request.get("max_line_events", LINE_PROFILE_MAX_EVENTS)),
+        )
+
+    unreached = _unreached_target(metrics)
+
+    if request.get("trace_alloc"):
+        # Separate pass so tracing overhead never leaks into the timings
+        metrics["allocations"] = unreached or trace_allocations(
+            _profile_target(request, namespace, code_obj, metrics),
+            top_n=int(request.get("top_n", TRACEMALLOC_TOP_N)),
+        )
+
+    if request.get("count_ops"):
+        metrics["cost"] = unreached or count_operations(
+            _profile_target(request, namespace, code_obj, metrics),
+            filename=code_obj.co_filename,
+            max_instructions=int(request.get("max_instructions", COST_MAX_INSTRUCTIONS)),
+        )
+    return 0
+
+
+def _write_all(fd: int, data: bytes) -> None:
+    view = memoryview(data)
+    while view:
+        written = os.write(fd, view)
+        view = view[written:]
+
+
+def _collect(captures: Dict[int, BoundedCapture], deadline: float) -> bool:
+    """
+    Drain the child's pipes into their captures until EOF on all of them or
+    the deadline passes. Returns whether the deadline passed.
+    """
+    selector = selectors.DefaultSelector()
+    for fd in captures:
+        selector.register(fd, selectors.EVENT_READ)
+
+    timed_out = False
+    try:
+        while selector.get_map():
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                timed_out = True
+                break
+            for key, _ in selector.select(timeout=remaining):
+                chunk = os.read(key.fd, _READ_CHUNK)
+                if chunk:
+                    captures[key.fd].feed(chunk)
+                else:
+                    selector.unregister(key.fd)
+    finally:
+        selector.close()
+
+    return timed_out
+
+
+def handle_request(
+    request: Dict[str, Any],
+    control_fds: Tuple[int, int],
+    scratch_dir: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Fork a child for one request and report its outcome. The child runs in
+    `scratch_dir` (also its TMPDIR), which is emptied once it is reaped.
+    """
+    timeout = float(request.get("timeout", 15))
+    stdin_data = (request.get("stdin") or "").encode()
+
+    in_r, in_w = os.pipe()
+    out_r, out_w = os.pipe()
+    err_r, err_w = os.pipe()
+    # Structured results travel on their own pipe, never mixed with stdout
+    res_r, res_w = os.pipe()
+
+    # Children must not inherit (and re-emit) buffered worker output
+    sys.stdout.flush()
+    sys.stderr.flush()
+
+    start_time = time.perf_counter()
+    pid = os.fork()
+
+    if pid == 0:
+        exit_code = 1
+        metrics: Dict[str, Any] = {}
+        try:
+            os.setsid()  # isolate process group
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            if request.get("cpu_limit"):
+                # Backstop: SIGXCPU at the soft limit, SIGKILL at the hard one
+                cpu_limit = int(request["cpu_limit"])
+                resource.setrlimit(resource.RLIMIT_CPU, (cpu_limit, cpu_limit + 1))
+            if scratch_dir:
+                os.chdir(scratch_dir)
+                os.environ["TMPDIR"] = scratch_dir
+                tempfile.tempdir = scratch_dir
+            os.dup2(in_r, 0)
+            os.dup2(out_w, 1)
+            os.dup2(err_w, 2)
+            for fd in (in_r, in_w, out_r, out_w, err_r, err_w, res_r, *control_fds):
+                os.close(fd)
+            exit_code = _run_child(request, metrics)
+        finally:
+            try:
+                sys.stdout.flush()
+                sys.stderr.flush()
+                _write_all(res_w, json.dumps(metrics).encode())
+            finally:
+                os._exit(exit_code)
+
+    os.close(in_r)
+    os.close(out_w)
+    os.close(err_w)
+    os.close(res_w)
+
+    try:
+        if stdin_data:
+            os.write(in_w, stdin_data)
+    except BrokenPipeError:
+        pass
+    finally:
+        os.close(in_w)
+
+    # Output beyond the cap is read and hashed but not kept
+    output_limit = int(request.get("output_limit", OUTPUT_CAPTURE_LIMIT))
+    captures = {
+        out_r: BoundedCapture(output_limit),
+        err_r: BoundedCapture(output_limit),
+        res_r: BoundedCapture(),
+    }
+    try:
+        timed_out = _collect(captures, start_time + timeout)
+    finally:
+        os.close(out_r)
+        os.close(err_r)
+        os.close(res_r)
+
+    try:
+        # Kill the whole group: also reaps anything the child spawned
+        os.killpg(pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        pass
+
+    _, status, rusage = os.wait4(pid, 0)
+    runtime = time.perf_counter() - start_time
+    usage = _rusage_dict(rusage)
+    if scratch_dir:
+        wipe(scratch_dir)
+
+    try:
+        metrics = json.loads(bytes(captures[res_r].buffer)) if captures[res_r].total else {}
+    except ValueError:
+        metrics = {}
+
+    # Killed by the run-limit timer or the CPU rlimit backstop
+    too_slow = (
+        bool(request.get("run_limit") or request.get("cpu_limit"))
+        and os.WIFSIGNALED(status)
+        and os.WTERMSIG(status) in (signal.SIGALRM, signal.SIGXCPU)
+    )
+
+    return {
+        "returncode": -1 if timed_out else os.waitstatus_to_exitcode(status),
+        "too_slow": too_slow,
+        "stdout": captures[out_r].text(),
+        "stderr": captures[err_r].text(),
+        "streams": {
+            "stdout": captures[out_r].summary(),
+            "stderr": captures[err_r].summary(),
+        },
+        "runtime": runtime,
+        "timed_out": timed_out,
+        "memory": max(metrics.get("measured_rss_mb", usage["max_rss_mb"]) - _baseline_rss_mb, 0.0),
+        "rusage": usage,
+        "metrics": metrics,
+    }
+
+
+def serve() -> None:
+    """Serve requests from stdin until the parent closes the pipe."""
+    # Move the control channel off fds 0/1 so stray prints cannot corrupt it
+    control_in = os.fdopen(os.dup(0), "rb")
+    control_out = os.fdopen(os.dup(1), "wb")
+    devnull = os.open(os.devnull, os.O_RDONLY)
+    os.dup2(devnull, 0)
+    os.close(devnull)
+    os.dup2(2, 1)
+
+    preload_modules()
+    calibrate_baseline_rss()
+    control_fds = (control_in.fileno(), control_out.fileno())
+    try:
+        scratch_dir = make_scratch_dir()
+    except OSError as e:
+        print(f"No scratch directory, children run in the worker's cwd: {e}", file=sys.stderr)
+        scratch_dir = None
+
+    try:
+        while True:
+            request = read_frame(control_in)
+            if request is None:
+                break
+            try:
+                response = handle_request(request, control_fds, scratch_dir)
+            except Exception as e:
+                response = {"error": f"Worker failure: {e}"}
+            control_out.write(encode_frame(response))
+            control_out.flush()
+    finally:
+        if scratch_dir:
+            shutil.rmtree(scratch_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    serve()
@@ -0,0 +1,738 @@
+"""
+In-child timing harness.
+
+Runs inside the forked sandbox child: the snippet is compiled once and only
+the execution of its body is timed, with the loop count auto-ranged the same
+way as ``timeit.Timer.autorange``.
+"""
+import builtins
+import cProfile
+import dis
+import gc
+import io
+import math
+import os
+import pstats
+import random
+import signal
+import statistics
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from typing import Callable, Dict, Any, Iterator, List, Optional, Tuple
+
+from executor.stats import median_ci, relative_ci_width
+
+# Bump whenever a change here makes old measurements incomparable
+HARNESS_VERSION = "1"
+
+
+def fresh_namespace() -> Dict[str, Any]:
+    """Globals for one execution of the snippet, as if run as a script."""
+    return {"__name__": "__main__", "__builtins__": builtins}
+
+
+class TimeLimitExceeded(BaseException):
+    """Raised inside the snippet when a time_limit() expires."""
+
+
+def _raise_time_limit(signum, frame):
+    raise TimeLimitExceeded()
+
+
+@contextmanager
+def time_limit(seconds: float) -> Iterator[None]:
+    """
+    Interrupt the enclosed code after `seconds` of wall time. Unlike the
+    run-limit timer this raises in the child instead of killing it, so the
+    caller can record the overrun and carry on.
+    """
+    previous = signal.signal(signal.SIGALRM, _raise_time_limit)
+    signal.setitimer(signal.ITIMER_REAL, max(seconds, 0.001))
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+@contextmanager
+def kill_after(seconds: Optional[float]) -> Iterator[None]:
+    """
+    The run-limit timer: end the child if the enclosed code runs longer than
+    `seconds` of wall time (no limit when None). SIGALRM keeps its default
+    action, so the kernel ends the child even inside C code and user code
+    cannot catch it; the worker reports the run as too slow.
+    """
+    if not seconds:
+        yield
+        return
+    previous = signal.signal(signal.SIGALRM, signal.SIG_DFL)
+    signal.setitimer(signal.ITIMER_REAL, max(seconds, 0.001))
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def seed_rngs(seed: int, include_numpy: bool = True) -> None:
+    """Seed the stdlib (and optionally numpy) global generators identically."""
+    random.seed(seed)
+    numpy = sys.modules.get("numpy")
+    if include_numpy and numpy is not None:
+        numpy.random.seed(seed % 2**32)
+
+
+class GCMonitor:
+    """
+    Cyclic-GC activity inside timed sections, recorded through gc.callbacks:
+    collections per generation, objects collected, time spent collecting and
+    the net number of GC-tracked allocations (what triggers collections).
+
+    In "disabled" mode sections run with the collector off, so timings are
+    free of collection pauses; the young garbage each section leaves behind
+    is collected right after it and that deferred collection is what gets
+    counted and timed. Allocations then only count objects still alive (or
+    stuck in cycles) at the end of a section, since nothing triggered a
+    collection midway, so compare figures taken in the same mode.
+    """
+
+    def __init__(self, mode: str = "enabled"):
+        self.mode = mode
+        self.collections = [0, 0, 0]
+        self.collected = 0
+        self.time = 0.0
+        self.allocations = 0
+        self.calls = 0
+        self.elapsed = 0.0
+        self._active = False
+        self._deferred = False
+        self._start = 0.0
+
+    def reset(self) -> None:
+        """Drop what calibration and warm-up recorded, keeping the mode."""
+        self.__init__(self.mode)
+
+    def _callback(self, phase: str, info: Dict[str, Any]) -> None:
+        if not self._active:
+            return
+        if phase == "start":
+            if not self._deferred:
+                # A collection resets the young count: bank what it held
+                self.allocations += gc.get_count()[0]
+            self._start = time.perf_counter()
+        else:
+            self.time += time.perf_counter() - self._start
+            self.collections[min(info["generation"], 2)] += 1
+            self.collected += info["collected"]
+
+    @contextmanager
+    def section(self, calls: int) -> Iterator[None]:
+        """Wrap one timed loop of `calls` executions."""
+        was_enabled = gc.isenabled()
+        if self.mode == "disabled":
+            gc.disable()
+        gc.callbacks.append(self._callback)
+        self._active = True
+        begin = gc.get_count()[0]
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.elapsed += time.perf_counter() - start
+            self.allocations += gc.get_count()[0] - begin
+            self.calls += calls
+            if self.mode == "disabled":
+                self._deferred = True
+                gc.collect(0)
+                self._deferred = False
+            self._active = False
+            gc.callbacks.remove(self._callback)
+            if was_enabled:
+                gc.enable()
+
+    def report(self) -> Dict[str, Any]:
+        calls = max(self.calls, 1)
+        return {
+            "mode": self.mode,
+            "calls": self.calls,
+            "collections": list(self.collections),
+            "collected": self.collected,
+            "time": self.time,
+            "time_per_call": self.time / calls,
+            "collections_per_call": sum(self.collections) / calls,
+            # A section's own delta can be negative when a collection banked
+            # young objects allocated before it; the total never should be
+            "allocations_per_call": max(self.allocations, 0) / calls,
+            # Share of the timed wall time (in "disabled" mode, relative to it)
+            "share": self.time / self.elapsed if self.elapsed > 0 else 0.0,
+        }
+
+
+def gc_section(monitor: Optional[GCMonitor], calls: int):
+    return monitor.section(calls) if monitor is not None else nullcontext()
+
+
+class Timer:
+    """Times repeated executions of a compiled snippet."""
+
+    def __init__(
+        self,
+        code_obj,
+        stdin_data: Optional[str] = None,
+        seed: Optional[int] = None,
+        base_namespace: Optional[Dict[str, Any]] = None,
+        gc_monitor: Optional[GCMonitor] = None,
+        call_limit: Optional[float] = None,
+    ):
+        self.code_obj = code_obj
+        self.stdin_data = stdin_data
+        self.seed = seed
+        # Reseeding numpy costs microseconds; only pay it for numpy snippets
+        self.seeds_numpy = "numpy" in code_obj.co_names
+        # Drivers run on top of the snippet's definitions
+        self.base_namespace = base_namespace
+        self.gc_monitor = gc_monitor
+        # Run limit per execution (see kill_after)
+        self.call_limit = call_limit
+
+    def timeit(self, number: int) -> Tuple[float, float]:
+        """
+        Total (wall, cpu) seconds for `number` executions, each in a fresh
+        namespace (a copy of base_namespace when given). CPU time is read around the whole loop since the process
+        clock is too coarse and costly to sample per call. With a gc_monitor
+        the loop is one GC section (see GCMonitor). With a call_limit the
+        child is killed once the loop takes longer than `number` x call_limit.
+        """
+        code_obj = self.code_obj
+        stdin_data = self.stdin_data
+        seed = self.seed
+        seeds_numpy = self.seeds_numpy
+        base_namespace = self.base_namespace
+        total = 0.0
+        limit = self.call_limit * number if self.call_limit else None
+        with gc_section(self.gc_monitor, number), kill_after(limit):
+            cpu_start = time.process_time()
+            for _ in range(number):
+                namespace = fresh_namespace() if base_namespace is None else dict(base_namespace)
+                if stdin_data is not None:
+                    sys.stdin = io.StringIO(stdin_data)
+                if seed is not None:
+                    seed_rngs(seed, seeds_numpy)
+                start = time.perf_counter()
+                exec(code_obj, namespace)
+                total += time.perf_counter() - start
+            cpu = time.process_time() - cpu_start
+        return total, cpu
+
+    def autorange(self, min_time: float, deadline: float) -> Tuple[int, float]:
+        """
+        Find a loop count taking at least `min_time` seconds of wall time,
+        per-iteration setup included so tiny snippets don't overrun the budget.
+        Tries 1, 2, 5, 10, 20, 50, ... like timeit; stops early at `deadline`.
+        Returns the loop count and the measured body time of the last loop.
+        """
+        i = 1
+        while True:
+            for j in (1, 2, 5):
+                number = i * j
+                start = time.perf_counter()
+                elapsed, _ = self.timeit(number)
+                if time.perf_counter() - start >= min_time or time.perf_counter() >= deadline:
+                    return number, elapsed
+            i *= 10
+
+
+def measure(
+    code_obj,
+    stdin_data: Optional[str],
+    min_time: float,
+    warmup: int,
+    min_samples: int,
+    max_samples: int,
+    ci_target: float,
+    budget: float,
+    base_namespace: Optional[Dict[str, Any]] = None,
+    gc_mode: str = "enabled",
+    call_limit: Optional[float] = None,
+) -> Dict[str, Any]:
+    """
+    Auto-range, warm up, then collect per-call timings of the snippet body
+    until the confidence interval on the median is within `ci_target`
+    (relative half-width) or the time budget is spent.
+    Output produced while timing is discarded; the caller has already
+    captured it from the first, untimed run. Garbage-collector activity
+    during the timed loops is reported under "gc"; gc_mode="disabled" times
+    them with the collector off (see GCMonitor). call_limit kills the child
+    when executions average longer than that many seconds (see kill_after).
+    """
+    deadline = time.perf_counter() + budget
+    monitor = GCMonitor(gc_mode)
+    timer = Timer(
+        code_obj, stdin_data, base_namespace=base_namespace, gc_monitor=monitor, call_limit=call_limit
+    )
+
+    saved_stdout = sys.stdout
+    sys.stdout = open(os.devnull, "w")
+    try:
+        number, elapsed = timer.autorange(min_time, deadline)
+        timings: List[float] = []
+        cpu_timings: List[float] = []
+        ci_width = math.inf
+        if time.perf_counter() >= deadline:
+            # Slow snippet: the auto-ranging loop is the only sample we can afford
+            timings.append(elapsed / number)
+        else:
+            for _ in range(warmup):
+                if time.perf_counter() >= deadline:
+                    break
+                timer.timeit(number)
+            # Baseline the GC figures on the sampled loops alone
+            monitor.reset()
+
+        while len(timings) < max_samples:
+            if timings and time.perf_counter() >= deadline:
+                break
+            wall, cpu = timer.timeit(number)
+            timings.append(wall / number)
+            cpu_timings.append(cpu / number)
+            if len(timings) >= min_samples:
+                ci_width = relative_ci_width(timings)
+                if ci_width <= ci_target:
+                    break
+    except BaseException as e:
+        return {"error": f"{type(e).__name__}: {e}"}
+    finally:
+        sys.stdout.close()
+        sys.stdout = saved_stdout
+
+    return {
+        "number": number,
+        "warmup": warmup,
+        "timings": timings,
+        "cpu_timings": cpu_timings,
+        "converged": ci_width <= ci_target,
+        "ci_width": ci_width if math.isfinite(ci_width) else None,
+        "gc": monitor.report(),
+    }
+
+
+def measure_paired(
+    baseline_obj,
+    candidate_obj,
+    stdin_data: Optional[str],
+    seed: int,
+    min_time: float,
+    min_samples: int,
+    max_samples: int,
+    ci_target: float,
+    budget: float,
+    gc_mode: str = "enabled",
+) -> Dict[str, Any]:
+    """
+    Interleaved A/B timing of a baseline and a candidate snippet.
+    Runs alternate AB, BA, AB, ... so drift and ordering effects hit both
+    sides equally; every execution starts from the same RNG seed. Each pair
+    yields a speedup ratio (baseline / candidate per-call time), sampled
+    until the CI on the median ratio is within `ci_target`. Each side's
+    collector activity is reported separately (see GCMonitor).
+    """
+    deadline = time.perf_counter() + budget
+    monitors = (GCMonitor(gc_mode), GCMonitor(gc_mode))
+    timers = (
+        Timer(baseline_obj, stdin_data, seed, gc_monitor=monitors[0]),
+        Timer(candidate_obj, stdin_data, seed, gc_monitor=monitors[1]),
+    )
+
+    saved_stdout = sys.stdout
+    sys.stdout = open(os.devnull, "w")
+    try:
+        numbers = [timer.autorange(min_time, deadline)[0] for timer in timers]
+        for timer, number in zip(timers, numbers):
+            timer.timeit(number)
+        for monitor in monitors:
+            monitor.reset()
+
+        per_call: Tuple[List[float], List[float]] = ([], [])
+        ratios: List[float] = []
+        ci_width = math.inf
+        while len(per_call[0]) < max_samples:
+            if per_call[0] and time.perf_counter() >= deadline:
+                break
+            order = (0, 1) if len(per_call[0]) % 2 == 0 else (1, 0)
+            pair = [0.0, 0.0]
+            for side in order:
+                wall, _ = timers[side].timeit(numbers[side])
+                pair[side] = wall / numbers[side]
+                per_call[side].append(pair[side])
+            if pair[1] > 0:
+                ratios.append(pair[0] / pair[1])
+            if len(ratios) >= min_samples:
+                ci_width = relative_ci_width(ratios)
+                if ci_width <= ci_target:
+                    break
+    except BaseException as e:
+        return {"error": f"{type(e).__name__}: {e}"}
+    finally:
+        sys.stdout.close()
+        sys.stdout = saved_stdout
+
+    if not ratios:
+        return {"error": "Candidate timing was zero"}
+    ci_low, ci_high = median_ci(ratios)
+    return {
+        "numbers": numbers,
+        "baseline_timings": per_call[0],
+        "candidate_timings": per_call[1],
+        "ratios": ratios,
+        "speedup": statistics.median(ratios),
+        "ci_low": ci_low,
+        "ci_high": ci_high,
+        "converged": ci_width <= ci_target,
+        "baseline_gc": monitors[0].report(),
+        "candidate_gc": monitors[1].report(),
+    }
+
+
+def trace_allocations(run: Callable[[], Any], top_n: int) -> Dict[str, Any]:
+    """
+    Call `run` once under tracemalloc.
+    Returns peak and final traced memory plus the largest live allocation
+    sites by file and line, measured while what `run` returned (its result
+    or the namespace it filled) is still alive.
+    """
+    saved_stdout = sys.stdout
+    sys.stdout = open(os.devnull, "w")
+    tracemalloc.start()
+    try:
+        kept = run()
+        current, peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot()
+    except BaseException as e:
+        return {"error": f"{type(e).__name__}: {e}"}
+    finally:
+        tracemalloc.stop()
+        sys.stdout.close()
+        sys.stdout = saved_stdout
+    del kept
+
+    snapshot = snapshot.filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, __file__),
+    ))
+    top = [
+        {
+            "file": stat.traceback[0].filename,
+            "line": stat.traceback[0].lineno,
+            "size_kb": stat.size / 1024,
+            "count": stat.count,
+        }
+        for stat in snapshot.statistics("lineno")[:top_n]
+    ]
+
+    return {
+        "peak_mb": peak / (1024 * 1024),
+        "current_mb": current / (1024 * 1024),
+        "top": top,
+    }
+
+
+# Profiler entries that belong to the sandbox rather than the snippet
+_PROFILER_NOISE = frozenset((
+    "<built-in method builtins.exec>",
+    "<method 'disable' of '_lsprof.Profiler' objects>",
+))
+
+
+def _profile_entry(func: Tuple[str, int, str], stat: Tuple) -> Dict[str, Any]:
+    filename, line, name = func
+    primitive_calls, calls, self_time, cumulative_time, _ = stat
+    builtin = filename == "~"
+    return {
+        "function": name,
+        "file": None if builtin else filename,
+        "line": None if builtin else line,
+        "calls": calls,
+        "primitive_calls": primitive_calls,
+        "self_time": self_time,
+        "cumulative_time": cumulative_time,
+    }
+
+
+def profile_hotspots(run: Callable[[], Any], top_n: int) -> Dict[str, Any]:
+    """
+    Call `run` once under cProfile. Returns the total profiled time and the
+    top functions by cumulative and by self time with their call counts;
+    builtins are included (file and line None), sandbox frames are not.
+    """
+    profiler = cProfile.Profile()
+    saved_stdout = sys.stdout
+    sys.stdout = open(os.devnull, "w")
+    try:
+        profiler.runcall(run)
+    except BaseException as e:
+        return {"error": f"{type(e).__name__}: {e}"}
+    finally:
+        sys.stdout.close()
+        sys.stdout = saved_stdout
+
+    own_files = {__file__, run.__code__.co_filename} if hasattr(run, "__code__") else {__file__}
+    entries = [
+        _profile_entry(func, stat)
+        for func, stat in pstats.Stats(profiler).stats.items()
+        if func[0] not in own_files and func[2] not in _PROFILER_NOISE
+    ]
+    by_cumulative = sorted(entries, key=lambda e: e["cumulative_time"], reverse=True)
+    by_self = sorted(entries, key=lambda e: e["self_time"], reverse=True)
+    return {
+        "total_time": sum(e["self_time"] for e in entries),
+        "by_cumulative": by_cumulative[:top_n],
+        "by_self": by_self[:top_n],
+    }
+
+
+# Call instructions across the interpreter versions that lack sys.monitoring
+_CALL_OPCODES = frozenset(
+    dis.opmap[name]
+    for name in ("CALL", "CALL_FUNCTION", "CALL_FUNCTION_KW", "CALL_FUNCTION_EX", "CALL_METHOD")
+    if name in dis.opmap
+)
+
+
+class _CostCounter:
+    """Counts executed instructions and calls made by one file's code."""
+
+    def __init__(self, filename: str, max_instructions: int):
+        self.filename = filename
+        self.max_instructions = max_instructions
+        self.instructions = 0
+        self.calls = 0
+        self.truncated = False
+
+    def _count_instruction(self) -> bool:
+        """Count one instruction; False once the cap is hit."""
+        self.instructions += 1
+        if self.instructions >= self.max_instructions:
+            self.truncated = True
+            return False
+        return True
+
+    def run_monitored(self, run: Callable[[], Any]) -> None:
+        """Python 3.12+: sys.monitoring INSTRUCTION and CALL events."""
+        monitoring = sys.monitoring
+        events = monitoring.events
+        tool = monitoring.PROFILER_ID
+
+        def on_instruction(code, offset):
+            if code.co_filename != self.filename:
+                return monitoring.DISABLE
+            if not self._count_instruction():
+                monitoring.set_events(tool, 0)
+
+        def on_call(code, offset, callable_obj, arg0):
+            if code.co_filename != self.filename:
+                return monitoring.DISABLE
+            self.calls += 1
+
+        monitoring.use_tool_id(tool, "sandbox-cost")
+        try:
+            monitoring.register_callback(tool, events.INSTRUCTION, on_instruction)
+            monitoring.register_callback(tool, events.CALL, on_call)
+            monitoring.set_events(tool, events.INSTRUCTION | events.CALL)
+            run()
+        finally:
+            monitoring.set_events(tool, 0)
+            monitoring.register_callback(tool, events.INSTRUCTION, None)
+            monitoring.register_callback(tool, events.CALL, None)
+            monitoring.free_tool_id(tool)
+
+    def run_traced(self, run: Callable[[], Any]) -> None:
+        """
+        Older interpreters: per-opcode tracing. Calls are the call opcodes
+        executed, matching what sys.monitoring reports as CALL events.
+        """
+        filename = self.filename
+
+        def local_trace(frame, event, arg):
+            if event == "opcode":
+                if frame.f_code.co_code[frame.f_lasti] in _CALL_OPCODES:
+                    self.calls += 1
+                if not self._count_instruction():
+                    sys.settrace(None)
+                    return None
+            return local_trace
+
+        def global_trace(frame, event, arg):
+            if frame.f_code.co_filename != filename:
+                return None
+            frame.f_trace_opcodes = True
+            return local_trace
+
+        sys.settrace(global_trace)
+        try:
+            run()
+        finally:
+            sys.settrace(None)
+
+
+def count_operations(
+    run: Callable[[], Any],
+    filename: str,
+    max_instructions: int,
+    seed: int = 0,
+) -> Dict[str, Any]:
+    """
+    Call `run` once, counting the bytecode instructions executed in the code
+    of `filename` (module body, functions, lambdas, comprehensions) and the
+    calls it makes, including calls into builtins and libraries. Library
+    internals are not counted, so the figure is deterministic for a given
+    input and seed, unlike wall time. Counting stops at `max_instructions`
+    and the result is flagged "truncated".
+    """
+    counter = _CostCounter(filename, max_instructions)
+    saved_stdout = sys.stdout
+    sys.stdout = open(os.devnull, "w")
+    seed_rngs(seed)
+    monitored = hasattr(sys, "monitoring")
+    try:
+        if monitored:
+            counter.run_monitored(run)
+        else:
+            counter.run_traced(run)
+    except BaseException as e:
+        return {"error": f"{type(e).__name__}: {e}"}
+    finally:
+        sys.stdout.close()
+        sys.stdout = saved_stdout
+
+    return {
+        "instructions": counter.instructions,
+        "calls": counter.calls,
+        "truncated": counter.truncated,
+        "method": "sys.monitoring" if monitored else "settrace",
+    }
+
+
+class _LineCounter:
+    """
+    Per-line execution counts and time of one file's code. The time between
+    two line events goes to the earlier line, so a line is charged for the
+    builtins it calls but not for the snippet functions it calls.
+    """
+
+    def __init__(self, filename: str, max_events: int):
+        self.filename = filename
+        self.max_events = max_events
+        self.events = 0
+        self.counts: Dict[int, int] = {}
+        self.times: Dict[int, float] = {}
+        self.truncated = False
+        self._line: Optional[int] = None
+        self._since = 0.0
+
+    def _on_line(self, line: int) -> bool:
+        """Record reaching `line`; False once the event cap is hit."""
+        now = time.perf_counter()
+        if self._line is not None:
+            self.times[self._line] = self.times.get(self._line, 0.0) + now - self._since
+        self.counts[line] = self.counts.get(line, 0) + 1
+        self._line = line
+        self.events += 1
+        if self.events >= self.max_events:
+            self.truncated = True
+            self._line = None
+            return False
+        self._since = time.perf_counter()
+        return True
+
+    def finish(self) -> None:
+        if self._line is not None:
+            self.times[self._line] = self.times.get(self._line, 0.0) + time.perf_counter() - self._since
+            self._line = None
+
+    def run_monitored(self, run: Callable[[], Any]) -> None:
+        """Python 3.12+: sys.monitoring LINE events."""
+        monitoring = sys.monitoring
+        tool = monitoring.COVERAGE_ID
+
+        def on_line(code, line):
+            if code.co_filename != self.filename:
+                return monitoring.DISABLE
+            if not self._on_line(line):
+                monitoring.set_events(tool, 0)
+
+        monitoring.use_tool_id(tool, "sandbox-lines")
+        try:
+            monitoring.register_callback(tool, monitoring.events.LINE, on_line)
+            monitoring.set_events(tool, monitoring.events.LINE)
+            run()
+        finally:
+            monitoring.set_events(tool, 0)
+            monitoring.register_callback(tool, monitoring.events.LINE, None)
+            monitoring.free_tool_id(tool)
+            self.finish()
+
+    def run_traced(self, run: Callable[[], Any]) -> None:
+        """Older interpreters: line tracing."""
+        filename = self.filename
+
+        def local_trace(frame, event, arg):
+            if event == "line" and not self._on_line(frame.f_lineno):
+                sys.settrace(None)
+                return None
+            return local_trace
+
+        def global_trace(frame, event, arg):
+            if frame.f_code.co_filename != filename:
+                return None
+            return local_trace
+
+        sys.settrace(global_trace)
+        try:
+            run()
+        finally:
+            sys.settrace(None)
+            self.finish()
+
+
+def line_profile(run: Callable[[], Any], filename: str, max_events: int) -> Dict[str, Any]:
+    """
+    Call `run` once, recording how often each line of `filename` executes
+    and its share of the time spent in that file's lines. Uses
+    sys.monitoring where available, else line tracing; either way the
+    per-event overhead inflates absolute times, so compare shares. Stops
+    recording after `max_events` line events and flags "truncated".
+    """
+    counter = _LineCounter(filename, max_events)
+    saved_stdout = sys.stdout
+    sys.stdout = open(os.devnull, "w")
+    monitored = hasattr(sys, "monitoring")
+    try:
+        if monitored:
+            counter.run_monitored(run)
+        else:
+            counter.run_traced(run)
+    except BaseException as e:
+        return {"error": f"{type(e).__name__}: {e}"}
+    finally:
+        sys.stdout.close()
+        sys.stdout = saved_stdout
+
+    total = sum(counter.times.values())
+    return {
+        "lines": [
+            {
+                "line": line,
+                "count": counter.counts[line],
+                "time": counter.times.get(line, 0.0),
+                "share": counter.times.get(line, 0.0) / total if total > 0 else 0.0,
+            }
+            for line in sorted(counter.counts)
+        ],
+        "total_time": total,
+        "events": counter.events,
+        "truncated": counter.truncated,
+        "method": "sys.monitoring" if monitored else "settrace",
+    }
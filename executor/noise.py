@@ -0,0 +1,86 @@
+"""
+Host noise-floor calibration.
+
+A fixed workload is benchmarked in several separate sandbox runs; the spread
+of their medians (or the widest CI of a run that converged, if larger) is
+how far apart two measurements of identical code can land on this host right
+now. Each comparison adds its own runs' CI widths on top (see
+executor.stats.significance). The result
+is cached for NOISE_CALIBRATION_INTERVAL seconds, so it tracks changing load
+without paying for a calibration on every request.
+"""
+import asyncio
+import statistics
+import time
+from typing import Dict, Any, Optional
+import structlog
+
+from executor.sandbox import execute_code
+from executor.stats import relative_ci_width
+from shared.config import (
+    NOISE_CALIBRATION_INTERVAL,
+    NOISE_CALIBRATION_RUNS,
+    NOISE_FLOOR_MIN,
+    NOISE_FLOOR_DEFAULT,
+)
+
+logger = structlog.get_logger()
+
+# Mixed allocation / arithmetic / sorting work, about a millisecond per run
+_CALIBRATION_CODE = """
+data = [(i * 7919) % 10007 for i in range(5000)]
+data.sort()
+total = sum(x * x for x in data)
+index = {x: i for i, x in enumerate(data[:1000])}
+"""
+
+_calibration: Optional[Dict[str, Any]] = None
+_pending: Optional[asyncio.Task] = None
+
+
+async def _calibrate() -> Dict[str, Any]:
+    medians = []
+    widths = []
+    for _ in range(NOISE_CALIBRATION_RUNS):
+        result = await execute_code(_CALIBRATION_CODE, harness=True)
+        timings = result.get("metrics", {}).get("harness", {}).get("timings")
+        if not result["success"] or not timings:
+            logger.warning("Noise calibration failed, using default floor", error=result.get("error"))
+            return {
+                "noise_floor": NOISE_FLOOR_DEFAULT,
+                "calibrated": False,
+                "measured_at": time.time(),
+            }
+        medians.append(statistics.median(timings))
+        # An unconverged run's CI says how short the run was, not how noisy the host is
+        if result["metrics"]["harness"].get("converged"):
+            widths.append(relative_ci_width(timings))
+
+    center = statistics.median(medians)
+    spread = (max(medians) - min(medians)) / center if center > 0 else NOISE_FLOOR_DEFAULT
+    floor = max(spread, max(widths, default=0.0), NOISE_FLOOR_MIN)
+    logger.info("Noise floor calibrated", noise_floor=floor, medians=medians)
+    return {
+        "noise_floor": floor,
+        "calibrated": True,
+        "medians": medians,
+        "measured_at": time.time(),
+    }
+
+
+async def get_noise_floor() -> Dict[str, Any]:
+    """
+    The current calibration: "noise_floor" is the relative runtime
+    difference below which two measurements are indistinguishable.
+    Recalibrates when the last one is older than NOISE_CALIBRATION_INTERVAL;
+    concurrent callers on the same event loop share one calibration.
+    """
+    global _calibration, _pending
+    if _calibration is not None and time.time() - _calibration["measured_at"] < NOISE_CALIBRATION_INTERVAL:
+        return _calibration
+
+    loop = asyncio.get_running_loop()
+    if _pending is None or _pending.done() or _pending.get_loop() is not loop:
+        _pending = loop.create_task(_calibrate())
+    _calibration = await asyncio.shield(_pending)
+    return _calibration
@@ -0,0 +1,205 @@
+"""
+Pool of pre-warmed fork-server workers backing the sandbox.
+"""
+import asyncio
+import os
+import sys
+from pathlib import Path
+from typing import Dict, Any, Optional
+import structlog
+
+from executor.protocol import encode_frame, read_frame_async
+from executor.scheduler import SandboxScheduler, plan_cores, pin_process
+from shared.config import SANDBOX_POOL_SIZE
+
+logger = structlog.get_logger()
+
+_PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# Extra time a worker gets beyond the request timeout before it is declared hung
+WORKER_GRACE_SECONDS = 5.0
+
+
+class WorkerError(RuntimeError):
+    """Raised when a sandbox worker dies or stops responding."""
+
+
+class SandboxWorker:
+    """A single `executor.forkserver` process and its control pipes."""
+
+    def __init__(self, process: asyncio.subprocess.Process):
+        self.process = process
+        self.broken = False
+
+    @classmethod
+    async def spawn(cls, core: Optional[int] = None) -> "SandboxWorker":
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join(
+            p for p in (str(_PROJECT_ROOT), env.get("PYTHONPATH")) if p
+        )
+        process = await asyncio.create_subprocess_exec(
+            sys.executable,
+            "-m",
+            "executor.forkserver",
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            env=env,
+        )
+        # Forked children inherit the worker's affinity
+        pin_process(process.pid, core)
+        return cls(process)
+
+    @property
+    def alive(self) -> bool:
+        return not self.broken and self.process.returncode is None
+
+    async def run(self, request: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+        """Send one request and wait for its response."""
+        try:
+            self.process.stdin.write(encode_frame(request))
+            await self.process.stdin.drain()
+            response = await asyncio.wait_for(
+                read_frame_async(self.process.stdout),
+                timeout=timeout + WORKER_GRACE_SECONDS,
+            )
+        except asyncio.CancelledError:
+            # A response may still be in flight; the worker can't be reused
+            self.kill()
+            raise
+        except (asyncio.TimeoutError, ConnectionError, ValueError) as e:
+            self.kill()
+            raise WorkerError(f"Sandbox worker unresponsive: {e!r}") from e
+
+        if response is None:
+            self.kill()
+            raise WorkerError("Sandbox worker exited unexpectedly")
+        if "error" in response:
+            raise WorkerError(response["error"])
+        return response
+
+    async def close(self) -> None:
+        """Ask the worker to exit by closing its control pipe."""
+        self.broken = True
+        if self.process.returncode is None:
+            self.process.stdin.close()
+            try:
+                await asyncio.wait_for(self.process.wait(), timeout=WORKER_GRACE_SECONDS)
+            except asyncio.TimeoutError:
+                self.kill()
+
+    def kill(self) -> None:
+        self.broken = True
+        if self.process.returncode is None:
+            try:
+                self.process.kill()
+            except ProcessLookupError:
+                pass
+
+
+class WorkerPool:
+    """
+    Sandbox workers behind a SandboxScheduler: one worker per slot, pinned
+    to the slot's core. With size 0 nothing is kept warm and each run gets
+    a throwaway worker, still admitted and pinned through the scheduler.
+    """
+
+    def __init__(self, size: int):
+        self.persistent = size > 0
+        slots = size if self.persistent else max(len(plan_cores()[0]), 1)
+        self.scheduler = SandboxScheduler(slots)
+        self._workers: Dict[int, SandboxWorker] = {}
+        self._start_lock = asyncio.Lock()
+        self._started = False
+
+    async def _ensure_started(self) -> None:
+        if self._started or not self.persistent:
+            return
+        async with self._start_lock:
+            if self._started:
+                return
+            workers = await asyncio.gather(
+                *(SandboxWorker.spawn(core) for core in self.scheduler.slots)
+            )
+            self._workers = dict(enumerate(workers))
+            self._started = True
+            logger.info(
+                "Sandbox worker pool started",
+                size=len(workers),
+                cores=self.scheduler.slots,
+            )
+
+    async def _worker_for(self, index: int, core: Optional[int]) -> SandboxWorker:
+        worker = self._workers.get(index)
+        if worker is None or not worker.alive:
+            if worker is not None:
+                worker.kill()
+            worker = await SandboxWorker.spawn(core)
+            self._workers[index] = worker
+        return worker
+
+    async def run(self, request: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+        """
+        Run a request once a slot is free.
+        The response carries "queue_wait" (seconds spent waiting for the
+        slot, excluded from "runtime") and the "core" it ran on.
+        """
+        await self._ensure_started()
+        async with self.scheduler.slot() as (index, core, queue_wait):
+            if self.persistent:
+                worker = await self._worker_for(index, core)
+                response = await worker.run(request, timeout)
+            else:
+                worker = await SandboxWorker.spawn(core)
+                try:
+                    response = await worker.run(request, timeout)
+                finally:
+                    await worker.close()
+        response["queue_wait"] = queue_wait
+        response["core"] = core
+        return response
+
+    def close(self) -> None:
+        for worker in self._workers.values():
+            worker.kill()
+        self._workers.clear()
+
+    async def shutdown(self) -> None:
+        """Let every worker exit and wait for it, before the loop closes."""
+        workers = list(self._workers.values())
+        self._workers.clear()
+        self._started = False
+        await asyncio.gather(*(worker.close() for worker in workers))
+
+
+_pool: Optional[WorkerPool] = None
+_pool_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_pool() -> WorkerPool:
+    """
+    Return the worker pool for the running event loop.
+    Worker pipes are bound to a loop, so a fresh loop gets a fresh pool and
+    pays worker start-up again: synchronous callers should keep one loop
+    (see rl/env.py) and await shutdown_pool() before closing it.
+    """
+    global _pool, _pool_loop
+    loop = asyncio.get_running_loop()
+    if _pool is None or _pool_loop is not loop:
+        if _pool is not None:
+            _pool.close()
+        _pool = WorkerPool(SANDBOX_POOL_SIZE)
+        _pool_loop = loop
+    return _pool
+
+
+async def shutdown_pool() -> None:
+    """
+    Let the running loop's workers exit and wait for them, so none of their
+    pipes outlives the loop. Call before closing a loop that ran sandbox
+    requests; the next request starts a new pool.
+    """
+    global _pool, _pool_loop
+    if _pool is None or _pool_loop is not asyncio.get_running_loop():
+        return
+    pool, _pool, _pool_loop = _pool, None, None
+    await pool.shutdown()
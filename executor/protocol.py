@@ -0,0 +1,69 @@
+"""
+Length-prefixed JSON framing used between the executor and its sandbox
+workers, locally over pipes and remotely over sockets (executor.daemon).
+"""
+import asyncio
+import json
+import struct
+from typing import Dict, Any, Optional, BinaryIO, Tuple, Union
+
+_HEADER = struct.Struct(">I")
+
+# Frames larger than this are treated as a protocol error rather than buffered
+MAX_FRAME_SIZE = 64 * 1024 * 1024
+
+
+def encode_frame(message: Dict[str, Any]) -> bytes:
+    """Serialize a message as a 4-byte big-endian length followed by JSON."""
+    payload = json.dumps(message).encode()
+    return _HEADER.pack(len(payload)) + payload
+
+
+def _decode_length(header: bytes) -> int:
+    (length,) = _HEADER.unpack(header)
+    if length > MAX_FRAME_SIZE:
+        raise ValueError(f"Frame of {length} bytes exceeds limit of {MAX_FRAME_SIZE}")
+    return length
+
+
+def read_frame(stream: BinaryIO) -> Optional[Dict[str, Any]]:
+    """
+    Read one frame from a blocking binary stream.
+    Returns None on a clean EOF.
+    """
+    header = stream.read(_HEADER.size)
+    if len(header) < _HEADER.size:
+        return None
+    length = _decode_length(header)
+    payload = stream.read(length)
+    if len(payload) < length:
+        return None
+    return json.loads(payload)
+
+
+async def read_frame_async(reader: asyncio.StreamReader) -> Optional[Dict[str, Any]]:
+    """
+    Read one frame from an asyncio stream.
+    Returns None on EOF.
+    """
+    try:
+        header = await reader.readexactly(_HEADER.size)
+        payload = await reader.readexactly(_decode_length(header))
+    except asyncio.IncompleteReadError:
+        return None
+    return json.loads(payload)
+
+
+def parse_address(address: str) -> Tuple[str, Union[str, Tuple[str, int]]]:
+    """
+    Split a worker address into ("unix", path) or ("tcp", (host, port)).
+    Addresses are written "unix:/run/sandbox.sock" or "tcp:host:port".
+    """
+    scheme, _, target = address.partition(":")
+    if scheme == "unix" and target:
+        return "unix", target
+    if scheme == "tcp":
+        host, _, port = target.rpartition(":")
+        if host and port.isdigit():
+            return "tcp", (host.strip("[]"), int(port))
+    raise ValueError(f"Bad worker address {address!r} (expected unix:PATH or tcp:HOST:PORT)")
@@ -0,0 +1,287 @@
+"""
+Client side of the remote sandbox workers (see executor.daemon).
+
+RemoteWorkerPool has the same run(request, timeout) interface as the local
+WorkerPool. Each request goes to the healthy endpoint with the fewest of
+this process's requests in flight per slot; endpoints are health-checked
+every SANDBOX_REMOTE_HEALTH_INTERVAL seconds, and one that refuses a
+connection is taken out of rotation until a later check succeeds. Workers
+running a different harness version are never used, since their numbers
+would not be comparable with local or cached ones.
+
+Once a request has been sent it is never run anywhere else: a daemon that
+times out or fails mid-request yields a failed (or timed-out) response.
+Only when no endpoint accepts the connection is RemoteUnavailable raised,
+so the caller can run the request locally instead.
+"""
+import asyncio
+import time
+from typing import Dict, Any, List, Optional, Tuple
+import structlog
+
+from executor.harness import HARNESS_VERSION
+from executor.pool import WorkerError, WORKER_GRACE_SECONDS
+from executor.protocol import encode_frame, parse_address, read_frame_async
+from shared.config import (
+    SANDBOX_REMOTE_WORKERS,
+    SANDBOX_REMOTE_TOKEN,
+    SANDBOX_REMOTE_HEALTH_INTERVAL,
+    SANDBOX_REMOTE_CONNECT_TIMEOUT,
+)
+
+logger = structlog.get_logger()
+
+# Request fields that only make sense on the host that built them
+_HOST_LOCAL_FIELDS = ("fixtures",)
+
+
+class RemoteUnavailable(WorkerError):
+    """No remote worker accepted the request, so nothing was run remotely."""
+
+
+class RemoteTimeout(WorkerError):
+    """A remote worker took the request but did not answer in time."""
+
+
+def _failed_response(error: str, timed_out: bool = False, runtime: float = 0.0) -> Dict[str, Any]:
+    """A fork-server-shaped response for a request lost on a remote worker."""
+    return {
+        "returncode": -1,
+        "too_slow": False,
+        "stdout": "",
+        "stderr": error,
+        "streams": {},
+        "runtime": runtime,
+        "timed_out": timed_out,
+        "memory": 0.0,
+        "rusage": {},
+        "metrics": {},
+    }
+
+
+class RemoteEndpoint:
+    """One daemon address, its last health report and idle connections."""
+
+    def __init__(self, address: str):
+        self.address = address
+        self.target = parse_address(address)
+        self.healthy = False
+        self.checked_at = 0.0
+        self.capacity = 1
+        self.inflight = 0
+        self.status: Dict[str, Any] = {}
+        self._idle: List[Tuple[asyncio.StreamReader, asyncio.StreamWriter]] = []
+
+    async def _connect(
+        self, reuse: bool = True
+    ) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter, bool]:
+        """
+        An open idle connection (when `reuse`), else a new one, and whether
+        it was reused. Raises RemoteUnavailable when none can be opened.
+        """
+        while reuse and self._idle:
+            reader, writer = self._idle.pop()
+            if not writer.is_closing() and not reader.at_eof():
+                return reader, writer, True
+            writer.close()
+        kind, target = self.target
+        if kind == "unix":
+            opening = asyncio.open_unix_connection(target)
+        else:
+            opening = asyncio.open_connection(*target)
+        try:
+            reader, writer = await asyncio.wait_for(opening, timeout=SANDBOX_REMOTE_CONNECT_TIMEOUT)
+        except asyncio.TimeoutError as e:
+            raise RemoteUnavailable(f"Connect to {self.address} timed out") from e
+        except OSError as e:
+            raise RemoteUnavailable(f"Connect to {self.address} failed: {e}") from e
+        return reader, writer, False
+
+    async def call(self, message: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+        """
+        Send one frame and wait for the reply. Raises RemoteUnavailable when
+        the daemon can't be reached (nothing was sent), RemoteTimeout when it
+        stops answering mid-request and ConnectionError (or ValueError for a
+        bad frame) when the connection is lost mid-request.
+        An idle connection the daemon has since dropped fails the same way,
+        so a reused connection that is lost is retried once on a new one.
+        """
+        if SANDBOX_REMOTE_TOKEN:
+            message = {**message, "token": SANDBOX_REMOTE_TOKEN}
+        reader, writer, reused = await self._connect()
+        try:
+            return await self._exchange(reader, writer, message, timeout)
+        except ConnectionError as e:
+            if not reused:
+                raise
+            logger.info("Stale remote sandbox connection, reconnecting", address=self.address, error=str(e))
+            # The other idle connections most likely went with it
+            self.close()
+        reader, writer, _ = await self._connect(reuse=False)
+        return await self._exchange(reader, writer, message, timeout)
+
+    async def _exchange(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+        message: Dict[str, Any],
+        timeout: float,
+    ) -> Dict[str, Any]:
+        """One request/reply on an open connection, which is kept idle afterwards."""
+        try:
+            writer.write(encode_frame(message))
+            await writer.drain()
+            response = await asyncio.wait_for(read_frame_async(reader), timeout=timeout)
+        except asyncio.TimeoutError as e:
+            writer.close()
+            raise RemoteTimeout(f"Remote worker {self.address} unresponsive") from e
+        except BaseException:
+            # A reply may still be in flight; the connection can't be reused
+            writer.close()
+            raise
+        if response is None:
+            writer.close()
+            raise ConnectionError(f"Remote worker {self.address} closed the connection")
+        self._idle.append((reader, writer))
+        return response
+
+    async def check(self) -> bool:
+        try:
+            status = await self.call({"op": "health"}, SANDBOX_REMOTE_CONNECT_TIMEOUT)
+        except (OSError, WorkerError, ValueError) as e:
+            status = {"error": str(e)}
+        self.checked_at = time.monotonic()
+        was_healthy = self.healthy
+        self.status = status
+        self.healthy = bool(status.get("ok")) and status.get("harness_version") == HARNESS_VERSION
+        if self.healthy:
+            self.capacity = max(int(status.get("capacity") or 1), 1)
+        if self.healthy != was_healthy:
+            logger.info(
+                "Remote sandbox worker health changed",
+                address=self.address,
+                healthy=self.healthy,
+                status=status,
+            )
+        return self.healthy
+
+    def mark_down(self, error: Exception) -> None:
+        self.healthy = False
+        self.checked_at = time.monotonic()
+        while self._idle:
+            self._idle.pop()[1].close()
+        logger.warning("Remote sandbox worker down", address=self.address, error=str(error))
+
+    def close(self) -> None:
+        while self._idle:
+            self._idle.pop()[1].close()
+
+
+class RemoteWorkerPool:
+    """Least-loaded dispatch of sandbox requests across remote daemons."""
+
+    def __init__(self, addresses: List[str]):
+        self.endpoints = [RemoteEndpoint(address) for address in addresses]
+        self._checking: Optional[asyncio.Task] = None
+
+    async def _check_all(self) -> None:
+        await asyncio.gather(*(endpoint.check() for endpoint in self.endpoints))
+        machines = {
+            endpoint.status.get("machine_id") for endpoint in self.endpoints if endpoint.healthy
+        }
+        if len(machines) > 1:
+            # Unpaired runs of a baseline and a candidate may land on different hosts
+            logger.warning("Remote sandbox workers run on different hardware", machines=sorted(machines))
+
+    async def refresh(self) -> None:
+        """Re-check endpoints whose last health check is stale; callers share one check."""
+        now = time.monotonic()
+        if all(now - e.checked_at < SANDBOX_REMOTE_HEALTH_INTERVAL for e in self.endpoints):
+            return
+        if self._checking is None or self._checking.done():
+            self._checking = asyncio.get_running_loop().create_task(self._check_all())
+        await asyncio.shield(self._checking)
+
+    async def machine_ids(self) -> List[str]:
+        """Fingerprints of the machines behind the healthy endpoints."""
+        await self.refresh()
+        return sorted({
+            endpoint.status["machine_id"]
+            for endpoint in self.endpoints
+            if endpoint.healthy and endpoint.status.get("machine_id")
+        })
+
+    def _pick(self, exclude: List[RemoteEndpoint]) -> Optional[RemoteEndpoint]:
+        candidates = [e for e in self.endpoints if e.healthy and e not in exclude]
+        if not candidates:
+            return None
+        return min(candidates, key=lambda e: e.inflight / e.capacity)
+
+    async def run(self, request: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+        """
+        Run a request on a remote worker. The response additionally carries
+        the "worker" address and its "machine_id". Endpoints that can't be
+        reached are skipped; RemoteUnavailable is raised when none is left.
+        A request lost after it was sent comes back as a failed response,
+        timed out if the worker stopped answering.
+        """
+        await self.refresh()
+        request = {key: value for key, value in request.items() if key not in _HOST_LOCAL_FIELDS}
+        message = {"op": "run", "request": request, "timeout": timeout}
+        tried: List[RemoteEndpoint] = []
+        while True:
+            endpoint = self._pick(tried)
+            if endpoint is None:
+                raise RemoteUnavailable("No healthy remote sandbox workers")
+            tried.append(endpoint)
+            endpoint.inflight += 1
+            try:
+                # Queueing on a busy daemon counts against the timeout too
+                response = await endpoint.call(message, timeout + 2 * WORKER_GRACE_SECONDS)
+            except RemoteUnavailable as e:
+                # Nothing was sent: safe to try another
+                endpoint.mark_down(e)
+                continue
+            except RemoteTimeout as e:
+                logger.warning("Remote sandbox worker timed out", address=endpoint.address, error=str(e))
+                response = _failed_response(str(e), timed_out=True, runtime=timeout)
+            except (OSError, ValueError) as e:
+                # The request may have run: report it rather than run it again
+                endpoint.mark_down(e)
+                response = _failed_response(f"Remote worker {endpoint.address} failed: {e}")
+            finally:
+                endpoint.inflight -= 1
+            if "error" in response:
+                logger.warning("Remote sandbox worker error", address=endpoint.address, error=response["error"])
+                response = _failed_response(f"{endpoint.address}: {response['error']}")
+            response["worker"] = endpoint.address
+            response["machine_id"] = endpoint.status.get("machine_id")
+            return response
+
+    def close(self) -> None:
+        if self._checking is not None:
+            self._checking.cancel()
+        for endpoint in self.endpoints:
+            endpoint.close()
+
+
+_pool: Optional[RemoteWorkerPool] = None
+_pool_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_remote_pool() -> Optional[RemoteWorkerPool]:
+    """
+    The remote pool for the running event loop, or None when no remote
+    workers are configured. Like executor.pool.get_pool, connections are
+    bound to a loop, so a fresh loop gets a fresh pool.
+    """
+    global _pool, _pool_loop
+    if not SANDBOX_REMOTE_WORKERS:
+        return None
+    loop = asyncio.get_running_loop()
+    if _pool is None or _pool_loop is not loop:
+        if _pool is not None:
+            _pool.close()
+        _pool = RemoteWorkerPool(list(SANDBOX_REMOTE_WORKERS))
+        _pool_loop = loop
+    return _pool
@@ -0,0 +1,126 @@
+"""
+Admission control for sandbox runs.
+
+Concurrent executions are capped at a fixed number of slots, each bound to a
+dedicated CPU core; callers queue FIFO for a free slot and the time spent
+waiting is reported separately from execution time.
+"""
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List, Optional, Tuple
+import structlog
+
+from shared.config import SANDBOX_CPUS, SANDBOX_RESERVE_HOST_CORE
+
+logger = structlog.get_logger()
+
+
+def _available_cores() -> List[int]:
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return []
+
+
+_plan: Optional[Tuple[List[int], List[int]]] = None
+_host_pinned = False
+
+
+def plan_cores() -> Tuple[List[int], List[int]]:
+    """
+    Split the cores this process may use into (sandbox cores, host cores).
+    SANDBOX_CPUS overrides the choice; otherwise the lowest core is left to
+    the API process when SANDBOX_RESERVE_HOST_CORE is set and there are
+    at least two cores. The plan is made once, from the affinity the
+    process started with, so pinning it to the host cores doesn't shrink it.
+    """
+    global _plan
+    if _plan is None:
+        _plan = _make_plan()
+    sandbox, host = _plan
+    return list(sandbox), list(host)
+
+
+def _make_plan() -> Tuple[List[int], List[int]]:
+    available = _available_cores()
+    if SANDBOX_CPUS:
+        sandbox = [c for c in SANDBOX_CPUS if c in available] if available else list(SANDBOX_CPUS)
+    elif SANDBOX_RESERVE_HOST_CORE and len(available) > 1:
+        sandbox = available[1:]
+    else:
+        sandbox = available
+    host = [c for c in available if c not in sandbox]
+    return sandbox, host
+
+
+def pin_host_process() -> None:
+    """
+    Keep this process (event loop, uvicorn) off the sandbox cores when
+    SANDBOX_RESERVE_HOST_CORE is set. Call once at start-up; later calls
+    do nothing.
+    """
+    global _host_pinned
+    if _host_pinned:
+        return
+    _host_pinned = True
+    sandbox_cores, host_cores = plan_cores()
+    if not SANDBOX_RESERVE_HOST_CORE or not host_cores or not hasattr(os, "sched_setaffinity"):
+        return
+    try:
+        os.sched_setaffinity(0, set(host_cores))
+    except OSError as e:
+        logger.warning("Could not pin host process", cores=host_cores, error=str(e))
+
+
+def pin_process(pid: int, core: Optional[int]) -> None:
+    """Restrict a process (and its future children) to one core."""
+    if core is None or not hasattr(os, "sched_setaffinity"):
+        return
+    try:
+        os.sched_setaffinity(pid, {core})
+    except OSError as e:
+        logger.warning("Could not pin sandbox process", pid=pid, core=core, error=str(e))
+
+
+class SandboxScheduler:
+    """
+    FIFO queue of execution slots, each pinned to its own core (or None when
+    affinity is unavailable). Slots are capped at the number of sandbox
+    cores: two runs sharing a core would disturb each other's timings.
+    """
+
+    def __init__(self, slots: int):
+        sandbox_cores, _ = plan_cores()
+        slots = max(slots, 1)
+        if sandbox_cores and slots > len(sandbox_cores):
+            logger.warning(
+                "Sandbox slots capped at the number of sandbox cores",
+                requested=slots,
+                cores=sandbox_cores,
+            )
+            slots = len(sandbox_cores)
+        self.slots: List[Optional[int]] = (
+            list(sandbox_cores[:slots]) if sandbox_cores else [None] * slots
+        )
+        self._free: asyncio.Queue = asyncio.Queue()
+        for index in range(len(self.slots)):
+            self._free.put_nowait(index)
+
+    @property
+    def capacity(self) -> int:
+        return len(self.slots)
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[Tuple[int, Optional[int], float]]:
+        """
+        Wait for a free slot.
+        Yields (slot index, core, seconds spent queued).
+        """
+        start = time.perf_counter()
+        index = await self._free.get()
+        queue_wait = time.perf_counter() - start
+        try:
+            yield index, self.slots[index], queue_wait
+        finally:
+            self._free.put_nowait(index)
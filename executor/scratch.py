@@ -0,0 +1,96 @@
+"""
+RAM-backed scratch directories for sandbox runs.
+
+Every worker (and every cold-run scheduler slot) owns one directory, named
+after the owning process, that user code runs in and writes its temporary
+files to. It is emptied after each run; directories (and fixture files) left
+behind by processes that died are swept when a new one is created.
+"""
+import os
+import shutil
+import tempfile
+from typing import Optional
+import structlog
+
+from shared.config import SANDBOX_SCRATCH_DIR
+
+logger = structlog.get_logger()
+
+_PREFIX = "sandbox-"
+
+# Linux tmpfs mount available to unprivileged processes
+_SHM_DIR = "/dev/shm"
+
+
+def scratch_root() -> str:
+    """SANDBOX_SCRATCH_DIR, else /dev/shm when usable, else the system temp dir."""
+    for candidate in (SANDBOX_SCRATCH_DIR, _SHM_DIR):
+        if candidate and os.path.isdir(candidate) and os.access(candidate, os.W_OK | os.X_OK):
+            return candidate
+    return tempfile.gettempdir()
+
+
+def _owner_alive(name: str) -> bool:
+    try:
+        pid = int(name[len(_PREFIX):].split("-")[0])
+    except ValueError:
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def sweep_stale(root: Optional[str] = None) -> int:
+    """
+    Remove scratch directories, and fixture files (see executor.fixtures),
+    whose owning process is gone. Returns the count.
+    """
+    root = root or scratch_root()
+    removed = 0
+    try:
+        entries = list(os.scandir(root))
+    except OSError:
+        return 0
+    for entry in entries:
+        if not entry.name.startswith(_PREFIX) or _owner_alive(entry.name):
+            continue
+        if entry.is_dir(follow_symlinks=False):
+            shutil.rmtree(entry.path, ignore_errors=True)
+        else:
+            try:
+                os.unlink(entry.path)
+            except OSError:
+                continue
+        removed += 1
+    return removed
+
+
+def make_scratch_dir(tag: str = "") -> str:
+    """Create this process's scratch directory (private to the user)."""
+    root = scratch_root()
+    sweep_stale(root)
+    suffix = f"-{tag}" if tag else ""
+    path = os.path.join(root, f"{_PREFIX}{os.getpid()}{suffix}")
+    shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(path, mode=0o700)
+    return path
+
+
+def wipe(path: str) -> None:
+    """Empty a scratch directory, keeping the directory itself."""
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    shutil.rmtree(entry.path, ignore_errors=True)
+                else:
+                    try:
+                        os.unlink(entry.path)
+                    except OSError:
+                        pass
+    except OSError as e:
+        logger.warning("Scratch directory wipe failed", path=path, error=str(e))
@@ -0,0 +1,106 @@
+"""
+Summary statistics for benchmark samples.
+
+Pure standard library so it can run inside the sandbox child as well as in
+the backend.
+"""
+import math
+import statistics
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+# Two-sided normal quantiles for the confidence levels we use
+_Z = {0.90: 1.645, 0.95: 1.96, 0.99: 2.576}
+
+
+def median_ci(samples: Sequence[float], confidence: float = 0.95) -> Tuple[float, float]:
+    """
+    Distribution-free confidence interval for the median.
+    Uses the order statistics at ranks n/2 -/+ z*sqrt(n)/2; with too few
+    samples this widens to the full sample range.
+    """
+    ordered = sorted(samples)
+    n = len(ordered)
+    if n == 0:
+        return 0.0, 0.0
+    z = _Z.get(confidence, 1.96)
+    half = z * math.sqrt(n) / 2
+    lo = max(int(math.floor(n / 2 - half)), 0)
+    hi = min(int(math.ceil(n / 2 + half)), n - 1)
+    return ordered[lo], ordered[hi]
+
+
+def relative_ci_width(samples: Sequence[float], confidence: float = 0.95) -> float:
+    """Half-width of the median CI relative to the median (inf if undefined)."""
+    if len(samples) < 2:
+        return math.inf
+    median = statistics.median(samples)
+    if median <= 0:
+        return math.inf
+    lo, hi = median_ci(samples, confidence)
+    return (hi - lo) / 2 / median
+
+
+def summarize(samples: Sequence[float], confidence: float = 0.95) -> Dict[str, Any]:
+    """Median, IQR, min, stddev, sample count and median CI of the samples."""
+    values: List[float] = list(samples)
+    n = len(values)
+    if n == 0:
+        return {
+            "median": 0.0, "iqr": 0.0, "min": 0.0, "stddev": 0.0,
+            "samples": 0, "ci_low": 0.0, "ci_high": 0.0,
+        }
+
+    if n >= 2:
+        q1, _, q3 = statistics.quantiles(values, n=4)
+        stddev = statistics.stdev(values)
+    else:
+        q1 = q3 = values[0]
+        stddev = 0.0
+    ci_low, ci_high = median_ci(values, confidence)
+
+    return {
+        "median": statistics.median(values),
+        "iqr": q3 - q1,
+        "min": min(values),
+        "stddev": stddev,
+        "samples": n,
+        "ci_low": ci_low,
+        "ci_high": ci_high,
+    }
+
+
+def summary_ci_width(summary: Optional[Dict[str, Any]]) -> float:
+    """Half-width of a summarize() result's median CI relative to its median (0 if unknown)."""
+    if not summary or summary.get("median", 0) <= 0:
+        return 0.0
+    return (summary["ci_high"] - summary["ci_low"]) / 2 / summary["median"]
+
+
+def significance(
+    baseline: float,
+    candidate: float,
+    noise_floor: float,
+    speedup_ci: Optional[Sequence[float]] = None,
+    ci_widths: Sequence[float] = (),
+) -> Dict[str, Any]:
+    """
+    Verdict on a runtime change: "faster" or "slower" only when the relative
+    change exceeds the threshold and, for paired measurements, the speedup
+    CI excludes 1; otherwise "insignificant". The threshold combines the
+    host's noise floor with the relative CI widths of the two measurements
+    themselves (root sum of squares), so a tightly measured change counts
+    even when an unrelated run was noisy. "change" is the relative runtime
+    change (negative is faster).
+    """
+    threshold = math.sqrt(noise_floor ** 2 + sum(w * w for w in ci_widths))
+    if baseline <= 0 or candidate <= 0:
+        return {"verdict": "insignificant", "change": 0.0, "noise_floor": noise_floor, "threshold": threshold}
+    change = candidate / baseline - 1
+    verdict = "insignificant"
+    if abs(change) > threshold:
+        verdict = "faster" if change < 0 else "slower"
+        if speedup_ci is not None:
+            ci_low, ci_high = speedup_ci
+            if (verdict == "faster" and ci_low <= 1) or (verdict == "slower" and ci_high >= 1):
+                verdict = "insignificant"
+    return {"verdict": verdict, "change": change, "noise_floor": noise_floor, "threshold": threshold}
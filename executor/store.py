@@ -0,0 +1,172 @@
+"""
+Append-only benchmark history in SQLite.
+
+Every fresh (uncached) benchmark is recorded with the code, its hash, the
+harness version, the host fingerprint, the measurement options, the summary
+statistics and every raw sample, so drift across deploys can be tracked and
+old baselines analysed with plain SQL without re-running anything. Rows are
+only ever inserted.
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+import structlog
+
+from executor.fingerprint import fingerprint_id, machine_fingerprint
+from executor.harness import HARNESS_VERSION
+from shared.config import BENCHMARK_STORE_PATH
+
+logger = structlog.get_logger()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS machines (
+    machine_id TEXT PRIMARY KEY,
+    details TEXT NOT NULL,
+    first_seen REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS code (
+    code_hash TEXT PRIMARY KEY,
+    code TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS benchmarks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    code_hash TEXT NOT NULL,
+    candidate_hash TEXT,
+    recorded_at REAL NOT NULL,
+    harness_version TEXT NOT NULL,
+    machine_id TEXT NOT NULL,
+    options TEXT NOT NULL,
+    runtime REAL,
+    memory REAL,
+    summary TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS samples (
+    benchmark_id INTEGER NOT NULL,
+    idx INTEGER NOT NULL,
+    value REAL NOT NULL,
+    cpu REAL,
+    PRIMARY KEY (benchmark_id, idx)
+);
+CREATE INDEX IF NOT EXISTS benchmarks_code_time ON benchmarks (code_hash, recorded_at);
+CREATE INDEX IF NOT EXISTS benchmarks_time ON benchmarks (recorded_at);
+"""
+
+
+def _default_path() -> Path:
+    return Path.home() / ".cache" / "rl-code-agent" / "history.sqlite3"
+
+
+def code_hash(code: str) -> str:
+    return hashlib.sha256(code.encode()).hexdigest()
+
+
+class BenchmarkStore:
+    """SQLite store of benchmark runs and their raw samples."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.Lock()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path), timeout=5.0, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            # WAL lets the API process and training runs append concurrently
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+            self._conn.execute(
+                "INSERT OR IGNORE INTO machines VALUES (?, ?, ?)",
+                (fingerprint_id(), json.dumps(machine_fingerprint(), sort_keys=True), time.time()),
+            )
+
+    def record(
+        self,
+        kind: str,
+        code: str,
+        options: Dict[str, Any],
+        result: Dict[str, Any],
+        samples: List[float],
+        cpu_samples: Optional[List[float]] = None,
+        candidate: Optional[str] = None,
+        machine_id: Optional[str] = None,
+    ) -> int:
+        """
+        Append one run. `samples` are the raw per-call timings (speedup
+        ratios for paired runs); `result` is stored as the summary with the
+        bulky per-run reports left out. `machine_id` is the fingerprint of
+        the machine that ran it, this host by default. Returns the row id.
+        """
+        summary = {
+            key: value
+            for key, value in result.items()
+            if key not in ("timings", "cpu_timings", "profile", "line_profile", "allocations")
+        }
+        hashes = [code_hash(code)] + ([code_hash(candidate)] if candidate is not None else [])
+        machine_id = machine_id or fingerprint_id()
+        with self._lock, self._conn:
+            # Remote daemons only report their fingerprint id, not its details
+            self._conn.execute(
+                "INSERT OR IGNORE INTO machines VALUES (?, ?, ?)", (machine_id, "{}", time.time())
+            )
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO code VALUES (?, ?)",
+                zip(hashes, [code] + ([candidate] if candidate is not None else [])),
+            )
+            cursor = self._conn.execute(
+                "INSERT INTO benchmarks (kind, code_hash, candidate_hash, recorded_at, harness_version,"
+                " machine_id, options, runtime, memory, summary) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    kind,
+                    hashes[0],
+                    hashes[1] if candidate is not None else None,
+                    time.time(),
+                    HARNESS_VERSION,
+                    machine_id,
+                    json.dumps(options, sort_keys=True, default=str),
+                    result.get("runtime"),
+                    result.get("memory"),
+                    json.dumps(summary, default=str),
+                ),
+            )
+            benchmark_id = cursor.lastrowid
+            cpu_samples = cpu_samples or []
+            self._conn.executemany(
+                "INSERT INTO samples VALUES (?, ?, ?, ?)",
+                (
+                    (benchmark_id, i, value, cpu_samples[i] if i < len(cpu_samples) else None)
+                    for i, value in enumerate(samples)
+                ),
+            )
+        return benchmark_id
+
+
+_store: Optional[BenchmarkStore] = None
+_store_failed = False
+
+
+def get_store() -> Optional[BenchmarkStore]:
+    """The process-wide store, or None if it cannot be opened."""
+    global _store, _store_failed
+    if _store is None and not _store_failed:
+        path = Path(BENCHMARK_STORE_PATH) if BENCHMARK_STORE_PATH else _default_path()
+        try:
+            _store = BenchmarkStore(path)
+        except (OSError, sqlite3.Error) as e:
+            logger.warning("Benchmark history store unavailable", path=str(path), error=str(e))
+            _store_failed = True
+    return _store
+
+
+def record_benchmark(kind: str, code: str, options: Dict[str, Any], result: Dict[str, Any], **kwargs) -> None:
+    """Append a run to the store, logging instead of raising on failure."""
+    store = get_store()
+    if store is None:
+        return
+    try:
+        store.record(kind, code, options, result, **kwargs)
+    except sqlite3.Error as e:
+        logger.warning("Benchmark history write failed", error=str(e))
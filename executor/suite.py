@@ -0,0 +1,240 @@
+"""
+User-supplied benchmark drivers and test cases.
+
+A suite is a plain dict that travels inside the sandbox request:
+
+    {
+        "function": "solve",        # function under test (default: entry point)
+        "test_cases": [             # each either a call or a whole-script run
+            {"args": [[3, 1, 2]], "kwargs": {}, "expected": [1, 2, 3]},
+            {"stdin": "5\n", "expected_output": "120"},
+        ],
+        "driver": "solve(list(range(n, 0, -1)))",
+        "sizes": [100, 1000],       # values of `n` the driver is timed at
+    }
+
+Test cases run against the snippet's own definitions after its first run;
+the driver is compiled separately and timed by the harness on top of those
+definitions, so only the driver's work is measured.
+"""
+import io
+import math
+import os
+import sys
+import time
+from collections.abc import Iterator, ValuesView
+from typing import Dict, Any, List, Optional
+
+from executor.complexity import find_entry_points, fit_complexity
+from executor.harness import TimeLimitExceeded, fresh_namespace, measure, time_limit
+
+# Wall-clock cap on a single test case
+CASE_TIMEOUT = 2.0
+
+# Failure details kept per suite
+_MAX_REPORTED_FAILURES = 5
+
+
+class Incomparable(Exception):
+    """Raised for values that only compare equal by identity (functions, lambdas, ...)."""
+
+
+def _attributes(value: Any) -> Optional[Dict[str, Any]]:
+    """Attributes of a user object, from its __dict__ and any __slots__."""
+    attributes = dict(vars(value)) if hasattr(value, "__dict__") else {}
+    for cls in type(value).__mro__:
+        slots = cls.__dict__.get("__slots__", ())
+        for slot in (slots,) if isinstance(slots, str) else slots:
+            if slot not in ("__dict__", "__weakref__") and hasattr(value, slot):
+                attributes[slot] = getattr(value, slot)
+    if not attributes and not hasattr(value, "__dict__"):
+        return None
+    return attributes
+
+
+def _normalize(value: Any) -> Any:
+    """
+    Make a return value comparable with JSON-decoded expectations.
+    Iterators (generators, map, reversed, ...) are consumed into lists;
+    values that only compare by identity raise Incomparable.
+    """
+    if isinstance(value, (list, tuple, Iterator, ValuesView)):
+        return [_normalize(v) for v in value]
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in value.items()}
+    if isinstance(value, (set, frozenset)):
+        return sorted((_normalize(v) for v in value), key=repr)
+    if type(value).__module__ == "numpy":
+        # Arrays and numpy scalars: plain lists and numbers
+        return _normalize(value.tolist())
+    if isinstance(value, (str, bytes, int, float, complex, type(None))):
+        return value
+    if callable(value):
+        raise Incomparable(f"{type(value).__name__} values only compare by identity")
+    attributes = _attributes(value)
+    if attributes is not None:
+        # Instances of user classes: compare by class name and attributes
+        return {"__class__": type(value).__name__, **_normalize(attributes)}
+    return value
+
+
+def outputs_match(actual: Any, expected: Any) -> bool:
+    """
+    Structural equality with a relative tolerance for floats. Raises
+    Incomparable when either side holds a value that cannot be compared.
+    """
+    actual = _normalize(actual)
+    expected = _normalize(expected)
+    if isinstance(actual, bool) or isinstance(expected, bool):
+        return actual is expected
+    if isinstance(actual, (int, float)) and isinstance(expected, (int, float)):
+        return math.isclose(actual, expected, rel_tol=1e-6, abs_tol=1e-9)
+    if isinstance(actual, list) and isinstance(expected, list):
+        return len(actual) == len(expected) and all(
+            outputs_match(a, e) for a, e in zip(actual, expected)
+        )
+    if isinstance(actual, dict) and isinstance(expected, dict):
+        return actual.keys() == expected.keys() and all(
+            outputs_match(actual[k], expected[k]) for k in actual
+        )
+    return actual == expected
+
+
+def resolve_function(namespace: Dict[str, Any], code: str, name: Optional[str]):
+    """The named function, or the snippet's first entry point if it was renamed."""
+    if name and callable(namespace.get(name)):
+        return namespace[name]
+    entry_points = find_entry_points(code)
+    if entry_points and callable(namespace.get(entry_points[0])):
+        return namespace[entry_points[0]]
+    return None
+
+
+def _run_case(case: Dict[str, Any], func, code_obj) -> Optional[str]:
+    """Run one case; returns None on success or a short failure reason."""
+    saved_stdin, saved_stdout = sys.stdin, sys.stdout
+    captured = io.StringIO()
+    try:
+        sys.stdin = io.StringIO(case.get("stdin") or "")
+        sys.stdout = captured if "expected_output" in case else open(os.devnull, "w")
+        with time_limit(float(case.get("timeout", CASE_TIMEOUT))):
+            if "args" in case or "kwargs" in case or "expected" in case:
+                if func is None:
+                    return "No function to call"
+                actual = func(*case.get("args", []), **case.get("kwargs", {}))
+                if "expected" in case and not outputs_match(actual, case["expected"]):
+                    return f"expected {case['expected']!r}, got {_normalize(actual)!r}"[:500]
+            else:
+                exec(code_obj, fresh_namespace())
+    except TimeLimitExceeded:
+        return "timed out"
+    except SystemExit as e:
+        if e.code not in (None, 0):
+            return f"exited with {e.code}"
+    except BaseException as e:
+        return f"{type(e).__name__}: {e}"[:500]
+    finally:
+        if sys.stdout is not captured:
+            sys.stdout.close()
+        sys.stdin, sys.stdout = saved_stdin, saved_stdout
+
+    if "expected_output" in case:
+        actual_output = captured.getvalue().strip()
+        if actual_output != str(case["expected_output"]).strip():
+            return f"expected output {case['expected_output']!r}, got {actual_output!r}"[:500]
+    return None
+
+
+def run_test_cases(
+    namespace: Dict[str, Any],
+    code: str,
+    code_obj,
+    suite: Dict[str, Any],
+) -> Dict[str, Any]:
+    """
+    Run every test case. Call cases use the suite's function (falling back
+    to the snippet's entry point); cases with only stdin/expected_output
+    re-run the whole snippet.
+    Returns pass counts, a per-case pass list and the first few failures.
+    """
+    func = resolve_function(namespace, code, suite.get("function"))
+    results: List[bool] = []
+    failures = []
+    for index, case in enumerate(suite.get("test_cases") or []):
+        reason = _run_case(case, func, code_obj)
+        results.append(reason is None)
+        if reason is not None and len(failures) < _MAX_REPORTED_FAILURES:
+            failures.append({"case": index, "reason": reason})
+    return {
+        "passed": sum(results),
+        "total": len(results),
+        "results": results,
+        "failures": failures,
+    }
+
+
+def measure_driver(
+    namespace: Dict[str, Any],
+    suite: Dict[str, Any],
+    stdin_data: Optional[str],
+    min_time: float,
+    warmup: int,
+    min_samples: int,
+    max_samples: int,
+    ci_target: float,
+    budget: float,
+    gc_mode: str = "enabled",
+    call_limit: Optional[float] = None,
+) -> Dict[str, Any]:
+    """
+    Time the suite's driver at each size (bound to `n`), splitting the
+    budget evenly. Without sizes the driver is timed once as is. The last
+    size is the target whose timings become the runtime; with three or
+    more sizes a complexity class is fitted too. call_limit kills the child
+    when driver runs take longer than that (see executor.harness.kill_after).
+    """
+    try:
+        driver_obj = compile(suite["driver"], "<driver>", "exec")
+    except SyntaxError as e:
+        return {"error": f"Driver does not compile: {e}"}
+
+    sizes = list(suite.get("sizes") or [])
+    per_size_budget = budget / max(len(sizes), 1)
+    runs = []
+    for size in sizes or [None]:
+        base = dict(namespace)
+        if size is not None:
+            base["n"] = size
+        start = time.perf_counter()
+        run = measure(
+            driver_obj,
+            stdin_data,
+            min_time=min_time,
+            warmup=warmup,
+            min_samples=min_samples,
+            max_samples=max_samples,
+            ci_target=ci_target,
+            budget=per_size_budget,
+            base_namespace=base,
+            gc_mode=gc_mode,
+            call_limit=call_limit,
+        )
+        if "error" in run:
+            where = f" at n={size}" if size is not None else ""
+            return {"error": f"Driver failed{where}: {run['error']}"}
+        run["size"] = size
+        run["elapsed"] = time.perf_counter() - start
+        runs.append(run)
+
+    medians = [sorted(r["timings"])[len(r["timings"]) // 2] for r in runs]
+    fit = fit_complexity(sizes, medians) if len(sizes) >= 3 else None
+    return {
+        "sizes": sizes,
+        "timings": medians,
+        "fit": fit,
+        "target_size": sizes[-1] if sizes else None,
+        "target_timings": runs[-1]["timings"],
+        "target_cpu_timings": runs[-1]["cpu_timings"],
+        "converged": runs[-1]["converged"],
+        "gc": runs[-1]["gc"],
+    }
@@ -0,0 +1,269 @@
+"""
+Throughput and latency benchmark of the sandbox itself.
+
+Drives execute_code and benchmark_code with snippets from experiments/dataset
+at increasing concurrency and reports, as JSON:
+
+  - per mode and concurrency level: executions per second, latency
+    percentiles, time spent queued for a slot, failures and child RSS
+  - spawn overhead: how long a fresh fork-server worker takes to answer its
+    first request, against a request on an already warm worker
+  - memory per worker: RSS and PSS of an idle fork-server after start-up
+
+    python -m executor.throughput --levels 1,2,4,8,16 --output sandbox-throughput.json
+
+The snippets and the order they are sent in are fixed by --seed, so two runs
+differ only in the executor and host they measure.
+"""
+import argparse
+import asyncio
+import json
+import platform
+import random
+import statistics
+import time
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+import structlog
+
+from executor.fingerprint import fingerprint_id, machine_fingerprint
+from executor.harness import HARNESS_VERSION
+from executor.pool import SandboxWorker, get_pool
+from executor.sandbox import benchmark_code, execute_code
+from executor.scheduler import pin_host_process
+from shared.config import SANDBOX_POOL_SIZE, SANDBOX_REMOTE_WORKERS
+
+logger = structlog.get_logger()
+
+_DATASET_DIR = Path(__file__).resolve().parent.parent / "experiments" / "dataset"
+
+# Request run on bare workers when measuring spawn overhead
+_TRIVIAL_REQUEST = {"code": "pass", "timeout": 5.0}
+
+
+def load_snippets(count: int, seed: int = 0, directory: Path = _DATASET_DIR) -> List[Tuple[str, str]]:
+    """A seeded sample of (file name, code) dataset snippets that compile, in send order."""
+    snippets = []
+    for path in sorted(directory.glob("*.py")):
+        code = path.read_text()
+        try:
+            compile(code, path.name, "exec")
+        except SyntaxError:
+            continue
+        snippets.append((path.name, code))
+    random.Random(seed).shuffle(snippets)
+    return snippets[:count]
+
+
+def _quantile(ordered: List[float], q: float) -> float:
+    """Linearly interpolated quantile of sorted values."""
+    position = (len(ordered) - 1) * q
+    low = int(position)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+
+
+def distribution(values: List[float]) -> Optional[Dict[str, float]]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return {
+        "p50": _quantile(ordered, 0.50),
+        "p90": _quantile(ordered, 0.90),
+        "p99": _quantile(ordered, 0.99),
+        "mean": statistics.fmean(ordered),
+        "max": ordered[-1],
+    }
+
+
+async def run_level(
+    mode: str,
+    snippets: List[Tuple[str, str]],
+    concurrency: int,
+    requests: int,
+) -> Dict[str, Any]:
+    """
+    Send `requests` executions through `concurrency` concurrent clients,
+    cycling through the snippets, and summarize what each client observed.
+    """
+    jobs = iter(range(requests))
+    latencies: List[float] = []
+    queue_waits: List[float] = []
+    child_rss: List[float] = []
+    failures: Dict[str, int] = {}
+
+    async def client() -> None:
+        # Clients share one iterator, so each job is taken exactly once
+        for index in jobs:
+            name, code = snippets[index % len(snippets)]
+            start = time.perf_counter()
+            if mode == "benchmark":
+                result = await benchmark_code(code, cache=False)
+            else:
+                result = await execute_code(code)
+            latencies.append(time.perf_counter() - start)
+            queue_waits.append(result.get("queue_wait", 0.0))
+            max_rss = result.get("rusage", {}).get("max_rss_mb")
+            if max_rss:
+                child_rss.append(max_rss)
+            if not result["success"]:
+                failures[name] = failures.get(name, 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return {
+        "mode": mode,
+        "concurrency": concurrency,
+        "requests": requests,
+        "failed": sum(failures.values()),
+        "failures": failures,
+        "elapsed": elapsed,
+        "throughput": requests / elapsed if elapsed > 0 else None,
+        "latency": distribution(latencies),
+        "queue_wait": distribution(queue_waits),
+        "child_max_rss_mb": distribution(child_rss),
+    }
+
+
+def _proc_status_mb(pid: int, path: str, field: str) -> Optional[float]:
+    """A kB field of a /proc file, in MB; None off Linux or if missing."""
+    try:
+        with open(f"/proc/{pid}/{path}") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1]) / 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+async def measure_workers(samples: int, warm_runs: int = 10) -> Dict[str, Any]:
+    """
+    Start `samples` bare fork-server workers one after another. Each one's
+    spawn-to-first-response time is its start-up cost; requests sent once it
+    is warm give the steady per-request cost, and its memory is read while
+    it sits idle.
+    """
+    startups: List[float] = []
+    warm: List[float] = []
+    rss: List[float] = []
+    pss: List[float] = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        worker = await SandboxWorker.spawn()
+        try:
+            await worker.run(dict(_TRIVIAL_REQUEST), _TRIVIAL_REQUEST["timeout"])
+            startups.append(time.perf_counter() - start)
+            for _ in range(warm_runs):
+                start = time.perf_counter()
+                await worker.run(dict(_TRIVIAL_REQUEST), _TRIVIAL_REQUEST["timeout"])
+                warm.append(time.perf_counter() - start)
+            pid = worker.process.pid
+            for values, path, field in ((rss, "status", "VmRSS"), (pss, "smaps_rollup", "Pss")):
+                value = _proc_status_mb(pid, path, field)
+                if value is not None:
+                    values.append(value)
+        finally:
+            await worker.close()
+
+    startup = distribution(startups)
+    warm_run = distribution(warm)
+    return {
+        "spawn": {
+            "samples": len(startups),
+            "worker_startup": startup,
+            "warm_request": warm_run,
+            # What a throwaway worker adds to a request (SANDBOX_POOL_SIZE = 0)
+            "overhead": startup["p50"] - warm_run["p50"] if startup and warm_run else None,
+        },
+        "worker_memory": {
+            "rss_mb": distribution(rss),
+            "pss_mb": distribution(pss),
+        },
+    }
+
+
+async def run_suite(
+    modes: List[str],
+    levels: List[int],
+    requests: Dict[str, int],
+    snippet_count: int,
+    seed: int,
+    spawn_samples: int,
+) -> Dict[str, Any]:
+    snippets = load_snippets(snippet_count, seed)
+    if not snippets:
+        raise SystemExit(f"No snippets found in {_DATASET_DIR}")
+
+    report: Dict[str, Any] = {
+        "meta": {
+            "recorded_at": time.time(),
+            "harness_version": HARNESS_VERSION,
+            "machine_id": fingerprint_id(),
+            "machine": machine_fingerprint(),
+            "python": platform.python_version(),
+            "pool_size": SANDBOX_POOL_SIZE,
+            "slots": get_pool().scheduler.capacity,
+            "remote_workers": list(SANDBOX_REMOTE_WORKERS),
+            "seed": seed,
+            "snippets": [name for name, _ in snippets],
+        },
+    }
+    if spawn_samples > 0:
+        report.update(await measure_workers(spawn_samples))
+
+    # Start the pool (and warm the workers) before anything is timed
+    await run_level("execute", snippets, max(levels), max(levels))
+
+    report["levels"] = []
+    for mode in modes:
+        for concurrency in levels:
+            level = await run_level(mode, snippets, concurrency, requests[mode])
+            logger.info(
+                "Sandbox load level done",
+                mode=mode,
+                concurrency=concurrency,
+                throughput=level["throughput"],
+                p99=(level["latency"] or {}).get("p99"),
+            )
+            report["levels"].append(level)
+    await get_pool().shutdown()
+    return report
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure sandbox throughput and latency.")
+    parser.add_argument("--modes", default="execute,benchmark", help="execute and/or benchmark")
+    parser.add_argument("--levels", type=_int_list, default=[1, 2, 4, 8, 16], help="concurrency levels")
+    parser.add_argument("--requests", type=int, default=64, help="execute_code calls per level")
+    parser.add_argument("--benchmark-requests", type=int, default=8, help="benchmark_code calls per level")
+    parser.add_argument("--snippets", type=int, default=24, help="dataset snippets to cycle through")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--spawn-samples", type=int, default=5, help="bare workers started (0 = skip)")
+    parser.add_argument("--output", default="sandbox-throughput.json", help="JSON report to write")
+    args = parser.parse_args()
+
+    modes = [m for m in args.modes.split(",") if m]
+    unknown = set(modes) - {"execute", "benchmark"}
+    if unknown or not args.levels:
+        parser.error(f"Unknown modes {sorted(unknown)}" if unknown else "No concurrency levels")
+    pin_host_process()
+    report = asyncio.run(run_suite(
+        modes,
+        args.levels,
+        {"execute": args.requests, "benchmark": args.benchmark_requests},
+        args.snippets,
+        args.seed,
+        args.spawn_samples,
+    ))
+    Path(args.output).write_text(json.dumps(report, indent=2) + "\n")
+    logger.info("Sandbox throughput report written", path=args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -12,6 +12,7 @@ from typing import Dict, Any, Tuple, Optional
 from rl.services.state_encoder import encode_state
 from rl.services.dataset_loader import get_random_sample
 from executor.sandbox import benchmark_code
+from executor.pool import shutdown_pool
 from backend.llm_service import optimize_with_llm
 from shared.config import MAX_REFINEMENT_STEPS, TRAINING_MODE
 
@@ -51,6 +52,8 @@ class CodeOptimizationEnv(gym.Env):
         self.initial_state_features = None
         self.previous_action = None  # Track previous action for exploration bonus
         self.episode_actions = []  # Track actions in episode for diversity regularization
+        # One loop for the env's lifetime: sandbox workers are bound to it
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
 
     def reset(
         self,
@@ -263,12 +266,12 @@ class CodeOptimizationEnv(gym.Env):
 
         try:
             # --- LLM Optimization ---
-            optimized_code = asyncio.run(
+            optimized_code = self._run(
                 optimize_with_llm(self.current_code, action)
             )
 
             # --- Benchmark Optimized Code ---
-            result = asyncio.run(
+            result = self._run(
                 benchmark_code(optimized_code)
             )
 
@@ -303,6 +306,25 @@ class CodeOptimizationEnv(gym.Env):
 
         return float(reward)
 
+    def _run(self, coro):
+        """
+        Run a coroutine on the env's event loop. Reusing one loop keeps the
+        pre-warmed sandbox workers alive between steps.
+        """
+        if self._loop is None or self._loop.is_closed():
+            self._loop = asyncio.new_event_loop()
+        return self._loop.run_until_complete(coro)
+
+    def close(self):
+        """Stop the sandbox workers before closing the env's event loop."""
+        if self._loop is not None and not self._loop.is_closed():
+            try:
+                self._loop.run_until_complete(shutdown_pool())
+            finally:
+                self._loop.close()
+        self._loop = None
+        super().close()
+
     def _get_obs(self):
         """Get current observation."""
         return encode_state(
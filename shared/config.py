@@ -1,4 +1,5 @@
 """Shared configuration constants."""
+import os
 
 # Server configuration
 BACKEND_PORT = 8000  # Dedicated port for backend server
@@ -15,6 +16,93 @@ TEMPERATURE = 0.2
 # Execution limits
 EXECUTION_TIMEOUT = 15  # seconds
 MAX_MEMORY_MB = 512
+CANDIDATE_RUNTIME_MULTIPLE = 10.0  # kill candidates slower than this x the baseline run
+# Floors only absorb timer and fork jitter, so the multiple applies to µs-scale work too
+CANDIDATE_MIN_RUN_LIMIT = 0.01  # seconds; never cap a candidate's whole run below this
+CANDIDATE_MIN_CALL_LIMIT = 0.001  # seconds; never cap one timed call (entry function, driver) below this
+SANDBOX_POOL_SIZE = 2  # concurrent sandbox runs / pre-warmed workers, at most one per sandbox core (0 = no warm workers)
+SANDBOX_CPUS = None  # core ids reserved for sandbox runs (None = all but the first core)
+SANDBOX_RESERVE_HOST_CORE = True  # pin the API process off the sandbox cores
+OUTPUT_CAPTURE_LIMIT = 1_000_000  # bytes of stdout / stderr kept per run (the rest is only hashed)
+SANDBOX_SCRATCH_DIR = None  # base for per-worker scratch dirs (None = /dev/shm, else system temp)
+# Remote sandbox daemons (python -m executor.daemon); when any are listed, sandbox
+# runs are load-balanced across them, falling back to local workers if none is up
+SANDBOX_REMOTE_WORKERS = tuple(  # "unix:/run/sandbox.sock,tcp:10.0.0.5:7700"
+    a.strip() for a in os.getenv("SANDBOX_REMOTE_WORKERS", "").split(",") if a.strip()
+)
+SANDBOX_REMOTE_TOKEN = os.getenv("SANDBOX_REMOTE_TOKEN") or None  # shared secret; required for non-loopback TCP
+SANDBOX_REMOTE_HEALTH_INTERVAL = 10.0  # seconds between health checks of each daemon
+SANDBOX_REMOTE_CONNECT_TIMEOUT = 2.0  # seconds; also the health-check timeout
+
+# In-sandbox timing harness (timeit-style autorange)
+HARNESS_MIN_TIME = 0.05  # seconds per auto-ranged timing loop
+
+# Benchmark statistics
+BENCHMARK_WARMUP = 1  # discarded timing loops before sampling
+BENCHMARK_MIN_SAMPLES = 5
+BENCHMARK_MAX_SAMPLES = 50
+BENCHMARK_CI_TARGET = 0.02  # stop once the 95% CI on the median is within +/-2%
+BENCHMARK_TIME_BUDGET = 2.0  # seconds of sampling per benchmark
+BENCHMARK_RUNTIME_SIGNAL = "wall"  # "wall" or "cpu" per-call time used as runtime
+BENCHMARK_PAIRED = True  # re-time candidates interleaved (ABAB) against the baseline
+# Cyclic GC during timed loops: "enabled" (collections happen, and are counted
+# and timed) or "disabled" (timed with the collector off; the deferred young
+# collection after each loop is counted and timed instead)
+BENCHMARK_GC_MODE = "enabled"
+
+# Benchmark result cache (keyed by code hash + harness version + host fingerprint)
+BENCHMARK_CACHE_ENABLED = True
+BENCHMARK_CACHE_DIR = None  # None = ~/.cache/rl-code-agent/benchmarks
+BENCHMARK_CACHE_SIZE = 256  # in-memory LRU entries
+BENCHMARK_CACHE_TTL = 7 * 24 * 3600  # seconds before a disk entry is evicted
+BENCHMARK_CACHE_MIN_SAMPLES = 5  # only reuse results with at least this many samples
+BENCHMARK_STORE_ENABLED = True  # append every fresh benchmark and its raw samples to SQLite
+BENCHMARK_STORE_PATH = None  # None = ~/.cache/rl-code-agent/history.sqlite3
+
+# Host noise floor: a fixed workload re-measured periodically; runtime changes
+# smaller than the floor are reported (and treated) as insignificant
+NOISE_CALIBRATION_INTERVAL = 300  # seconds a calibration stays valid
+NOISE_CALIBRATION_RUNS = 3  # separate benchmark runs of the calibration workload
+NOISE_FLOOR_MIN = 0.01  # never trust differences below 1%
+NOISE_FLOOR_DEFAULT = 0.05  # used when calibration fails
+
+# Allocation profiling (tracemalloc); applies to the baseline and every
+# candidate alike, so memory is always compared on the same measure
+TRACEMALLOC_ENABLED = True
+TRACEMALLOC_TOP_N = 10  # allocation sites reported
+
+# cProfile hot-spot report fed into the runtime and memory agents' prompts
+PROFILE_HOTSPOTS = True
+PROFILE_TOP_N = 8  # functions reported by cumulative and by self time
+PROFILE_PROMPT_LINES = 5  # functions quoted in an agent prompt
+
+# Line-level execution counts and time shares of the timed work
+LINE_PROFILE_ENABLED = True
+LINE_PROFILE_MAX_EVENTS = 2_000_000  # line events recorded before giving up
+
+# Input synthesis + complexity fitting for snippets that only define functions
+COMPLEXITY_ENABLED = True
+COMPLEXITY_SIZES = (16, 32, 64, 128, 256, 512, 1024, 2048, 4096)  # input sizes tried, in order
+COMPLEXITY_TARGET_SIZE = 1024  # size whose per-call time is reported as runtime
+COMPLEXITY_REPEAT = 5  # timing loops per size
+COMPLEXITY_SIZE_BUDGET = 0.5  # seconds; stop growing sizes once one takes longer
+# Inputs for a known workload are synthesized once and shared via a RAM-backed file
+FIXTURES_ENABLED = True
+FIXTURE_CACHE_SIZE = 8  # fixture files kept per host process
+FIXTURE_MAX_BYTES = 64 * 1024 * 1024  # larger sizes fall back to in-child generation
+
+# Differential fuzzing of candidates against the baseline before benchmarking
+EQUIVALENCE_ENABLED = True
+EQUIVALENCE_TRIALS = 64  # generated inputs per check (stops at the first mismatch)
+
+# Deterministic cost metric (bytecode instructions executed by the snippet)
+REWARD_RUNTIME_SIGNAL = "time"  # "time" (measured runtime) or "cost" (instruction count)
+# Which measured runtime the reward compares: "warm" (steady-state per call),
+# "cold" (imports + first run) or "amortized" (cold run spread over N runs)
+REWARD_RUNTIME_PHASE = "warm"
+REWARD_AMORTIZE_RUNS = 100
+REWARD_GC_SHARE = 0.3  # share of the memory objective given to reduced GC pressure
+COST_MAX_INSTRUCTIONS = 10_000_000  # stop counting past this and flag the cost truncated
 
 # Rate limiting
 DAILY_REQUEST_LIMIT = 5
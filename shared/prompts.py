@@ -1,6 +1,9 @@
 """
 Strategy-specific prompts for code optimization.
 """
+from typing import Dict, Any, Optional
+
+from shared.config import PROFILE_PROMPT_LINES
 
 STRATEGY_PROMPTS = {
     0: """You are an expert code optimizer specializing in algorithmic improvements.
@@ -58,3 +61,22 @@ def get_prompt(strategy: int, code: str) -> str:
         strategy = 5  # Fallback to alternative solution
     return STRATEGY_PROMPTS[strategy].format(code=code)
 
+
+def format_hotspots(profile: Optional[Dict[str, Any]], limit: int = PROFILE_PROMPT_LINES) -> str:
+    """
+    Compact summary of a benchmark's cProfile report for an agent prompt:
+    the functions with the most self time, with their share of the profiled
+    time and call counts. Empty when there is no usable profile.
+    """
+    if not profile or "error" in profile or not profile.get("by_self"):
+        return ""
+    total = profile["total_time"] or 1e-12
+    lines = ["Profiler hot spots of this code (share of run time):"]
+    for entry in profile["by_self"][:limit]:
+        where = f" (line {entry['line']})" if entry.get("line") else ""
+        lines.append(
+            f"- {entry['function']}{where}: {entry['self_time'] / total:.0%} self, "
+            f"{entry['cumulative_time'] / total:.0%} including callees, "
+            f"{entry['calls']} calls"
+        )
+    return "\n".join(lines) + "\n\n"
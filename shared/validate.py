@@ -0,0 +1,151 @@
+"""
+Fast in-process checks on candidate code before it reaches the sandbox.
+"""
+import ast
+import builtins
+from typing import Dict, List, Optional, Set, Tuple
+
+# Names readable in any module without being bound: builtins and module globals
+_PREDEFINED_NAMES = frozenset(dir(builtins)) | {
+    "__name__", "__file__", "__doc__", "__builtins__", "__spec__", "__loader__",
+}
+
+# Implicit inside class bodies (__qualname__, __module__) and in methods that
+# use zero-argument super() or read __class__
+_CLASS_NAMES = frozenset({"__class__", "__qualname__", "__module__"})
+
+# (required positional, max positional or None with *args, required keyword-only)
+Signature = Tuple[int, Optional[int], Set[str]]
+
+
+def _bound_names(tree: ast.AST) -> Set[str]:
+    """Every name the code binds anywhere, in any scope."""
+    names: Set[str] = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name) and isinstance(node.ctx, (ast.Store, ast.Del)):
+            names.add(node.id)
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            names.add(node.name)
+        elif isinstance(node, ast.arg):
+            names.add(node.arg)
+        elif isinstance(node, (ast.Import, ast.ImportFrom)):
+            for alias in node.names:
+                names.add(alias.asname or alias.name.split(".")[0])
+        elif isinstance(node, ast.ExceptHandler) and node.name:
+            names.add(node.name)
+        elif isinstance(node, (ast.MatchAs, ast.MatchStar)) and node.name:
+            names.add(node.name)
+        elif isinstance(node, ast.MatchMapping) and node.rest:
+            names.add(node.rest)
+    return names
+
+
+def undefined_names(tree: ast.AST) -> List[str]:
+    """
+    Names read somewhere that are bound nowhere in the code and are not
+    builtins. Scopes are not distinguished, so this only reports names that
+    are certain to fail; star imports disable the check.
+    """
+    for node in ast.walk(tree):
+        if isinstance(node, ast.ImportFrom) and any(a.name == "*" for a in node.names):
+            return []
+    known = _bound_names(tree) | _PREDEFINED_NAMES
+    if any(isinstance(node, ast.ClassDef) for node in ast.walk(tree)):
+        known |= _CLASS_NAMES
+    missing = {
+        node.id
+        for node in ast.walk(tree)
+        if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Load) and node.id not in known
+    }
+    return sorted(missing)
+
+
+def _arity(func: ast.AST) -> Signature:
+    args = func.args
+    positional = len(args.posonlyargs) + len(args.args)
+    required = positional - len(args.defaults)
+    kw_required = {
+        arg.arg for arg, default in zip(args.kwonlyargs, args.kw_defaults) if default is None
+    }
+    return required, (None if args.vararg else positional), kw_required
+
+
+def public_signatures(tree: ast.Module) -> Dict[str, Optional[Signature]]:
+    """
+    Public (non-underscore) top-level functions and classes. Functions map
+    to their arity, classes to None.
+    """
+    signatures: Dict[str, Optional[Signature]] = {}
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            signatures[node.name] = _arity(node)
+        elif isinstance(node, ast.ClassDef):
+            signatures[node.name] = None
+    return {name: sig for name, sig in signatures.items() if not name.startswith("_")}
+
+
+def _top_level_bindings(tree: ast.Module) -> Set[str]:
+    names: Set[str] = set()
+    for node in tree.body:
+        targets = []
+        if isinstance(node, ast.Assign):
+            targets = node.targets
+        elif isinstance(node, (ast.AnnAssign, ast.AugAssign)):
+            targets = [node.target]
+        elif isinstance(node, (ast.Import, ast.ImportFrom)):
+            names.update(alias.asname or alias.name.split(".")[0] for alias in node.names)
+        for target in targets:
+            names.update(n.id for n in ast.walk(target) if isinstance(n, ast.Name))
+    return names
+
+
+def _compatible(original: Signature, candidate: Signature) -> bool:
+    """Whether every call the original accepts is accepted by the candidate too."""
+    required, maximum, kw_required = original
+    cand_required, cand_maximum, cand_kw_required = candidate
+    if cand_required > required:
+        return False
+    if cand_maximum is not None and (maximum is None or cand_maximum < maximum):
+        return False
+    return cand_kw_required <= kw_required
+
+
+def validate_candidate(original_code: str, candidate_code: str) -> List[str]:
+    """
+    Reasons to reject a candidate without running it; empty when it passes.
+    Checks that it compiles, reads no name that is never defined, and keeps
+    the original's public top-level functions (callable with the same
+    arguments) and classes.
+    """
+    try:
+        tree = ast.parse(candidate_code)
+        compile(tree, "<candidate>", "exec")
+    except SyntaxError as e:
+        return [f"Does not compile: {e.msg} (line {e.lineno})"]
+    except ValueError as e:
+        return [f"Does not compile: {e}"]
+
+    reasons = []
+    missing = undefined_names(tree)
+    if missing:
+        reasons.append(f"Undefined names: {', '.join(missing)}")
+
+    try:
+        original_tree = ast.parse(original_code)
+    except SyntaxError:
+        return reasons
+    candidate_signatures = public_signatures(tree)
+    candidate_bindings = _top_level_bindings(tree)
+    for name, signature in public_signatures(original_tree).items():
+        if name not in candidate_signatures:
+            if name not in candidate_bindings:
+                reasons.append(f"Missing {name} from the original")
+            continue
+        candidate_signature = candidate_signatures[name]
+        if signature is None or candidate_signature is None:
+            if (signature is None) != (candidate_signature is None):
+                reasons.append(f"{name} changed between function and class")
+            continue
+        if not _compatible(signature, candidate_signature):
+            reasons.append(f"{name}() no longer accepts the original's arguments")
+    return reasons
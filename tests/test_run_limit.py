@@ -0,0 +1,64 @@
+"""Baseline-relative run limits for candidate benchmarks."""
+import asyncio
+import os
+
+import pytest
+
+from executor.pool import shutdown_pool
+from executor.sandbox import benchmark_code, candidate_run_limit
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "fork"), reason="sandbox workers need fork")
+
+BASELINE = """
+def total(xs):
+    s = 0
+    for x in xs:
+        s += x
+    return s
+"""
+
+# Same result, the same loop run a hundred times over
+SLOWER = """
+def total(xs):
+    for _ in range(100):
+        s = 0
+        for x in xs:
+            s += x
+    return s
+"""
+
+
+def _benchmark_pair(candidate: str):
+    async def run():
+        try:
+            baseline = await benchmark_code(BASELINE, cache=False)
+            run_limit = candidate_run_limit(baseline)
+            result = await benchmark_code(
+                candidate,
+                run_limit=run_limit,
+                workload=baseline["complexity"]["spec"],
+                cache=False,
+            )
+            return baseline, run_limit, result
+        finally:
+            await shutdown_pool()
+
+    return asyncio.run(run())
+
+
+def test_limit_follows_microsecond_baseline():
+    baseline = {"runtime": 11.5e-6, "first_run": 1e-4, "complexity": {"target_size": 1024}}
+    assert candidate_run_limit(baseline) < 0.005
+
+
+def test_hundred_times_slower_candidate_is_killed():
+    baseline, run_limit, result = _benchmark_pair(SLOWER)
+    assert baseline["success"] and baseline["runtime"] < 1e-3
+    assert result["success"] is False
+    assert result["too_slow"] is True
+
+
+def test_equally_fast_candidate_is_not_killed():
+    _, _, result = _benchmark_pair(BASELINE)
+    assert result["success"] is True
+    assert not result.get("too_slow")
@@ -0,0 +1,34 @@
+"""In-process candidate checks."""
+import ast
+
+from shared.validate import undefined_names
+
+
+def names(code: str):
+    return undefined_names(ast.parse(code))
+
+
+def test_implicit_class_names_are_defined():
+    code = """
+class Point:
+    label = __qualname__ + "@" + __module__
+
+    def kind(self):
+        return __class__.__name__
+
+    def __repr__(self):
+        return super().__repr__()
+"""
+    assert names(code) == []
+
+
+def test_class_names_outside_a_class_are_undefined():
+    assert names("def f():\n    return __class__\n") == ["__class__"]
+
+
+def test_unbound_name_is_reported():
+    assert names("def f(xs):\n    return sorted(ys)\n") == ["ys"]
+
+
+def test_star_import_disables_the_check():
+    assert names("from math import *\nx = sqrt(y)\n") == []